@@ -0,0 +1,255 @@
+"""
+Job graph of the generators: every output with its renderer, parameters and
+estimated cost. Planning only needs the standard library, so listing jobs
+never imports PIL or a rendering backend.
+"""
+
+from collections import namedtuple
+import os
+import struct
+
+# Sources
+LOGO_PATH = "logo/logo.png"
+LOGO_SVG_PATH = "logo_ai/tos1024.svg"
+LOGO_MASTER_PATH = "logo_ai/tos1024.ai"
+SOURCE_LOGO = "logo/TOS.png"
+SOURCE_LOGO_TRANSPARENT = "logo/TOS_transparent.png"
+SOURCE_SVG_TRANSPARENT = "logo_ai/tos1024.svg"
+SOURCE_MASTER_TRANSPARENT = "logo_ai/tos1024.ai"
+
+# Output directories
+LOGO_DIR = "logo"
+BANNERS_PNG_DIR = "banners/png"
+BANNERS_SVG_DIR = "banners/svg"
+ICONS_PNG_DIR = "icons/png"
+ICONS_SVG_DIR = "icons/svg"
+
+# Colors
+BLACK = (0, 0, 0, 255)
+WHITE = (255, 255, 255, 255)
+GREEN = (2, 255, 207, 255)  # #02FFCF
+GOLD = (212, 175, 55, 255)  # Golden color from logo
+TRANSPARENT = (0, 0, 0, 0)
+
+# Banner variants: (filename, background, logo color, text color)
+BANNER_VARIANTS = [
+    ("black_background_white_logo.png", BLACK, GOLD, WHITE),
+    ("white_background_black_logo.png", WHITE, GOLD, BLACK),
+    ("green_background_black_logo.png", GREEN, GOLD, BLACK),
+    ("gradient_green_background_white_logo.png", GREEN, GOLD, WHITE),
+    ("transparent_backgroud_black_logo.png", TRANSPARENT, GOLD, BLACK),
+    ("transparent_background_white_logo.png", TRANSPARENT, GOLD, WHITE),
+    ("transparent_background_green_logo.png", TRANSPARENT, GOLD, GREEN),
+]
+
+SVG_BANNER_VARIANTS = [
+    ("black_background_white_logo.svg", BLACK, GOLD, WHITE),
+    ("white_background_black_logo.svg", WHITE, GOLD, BLACK),
+    ("green_background_black_logo.svg", GREEN, GOLD, BLACK),
+    ("gradient_green_background_white_logo.svg", GREEN, GOLD, WHITE),
+    ("transparent_background_black_logo.svg", TRANSPARENT, GOLD, BLACK),
+    ("transparent_background_white_logo.svg", TRANSPARENT, GOLD, WHITE),
+    ("transparent_background_green_logo.svg", TRANSPARENT, GOLD, GREEN),
+]
+
+# Icon variants: (filename, background, logo color), shared by circle and square icons
+ICON_VARIANTS = [
+    ("black_background_green_logo.png", BLACK, GREEN),
+    ("black_background_white_logo.png", BLACK, WHITE),
+    ("green_background_black_logo.png", GREEN, BLACK),
+    ("green_background_white_logo.png", GREEN, WHITE),
+    ("white_background_black_logo.png", WHITE, BLACK),
+    ("white_background_green_logo.png", WHITE, GREEN),
+]
+
+# Transparent icon variants: (filename, logo color)
+TRANSPARENT_ICON_VARIANTS = [
+    ("black.png", BLACK),
+    ("white.png", WHITE),
+    ("green.png", GREEN),
+]
+
+# Sizes to generate for logo files
+LOGO_SIZES = [16, 32, 48, 64, 128, 256, 512, 1024]
+
+# Sizes to generate for logo-transparent files
+TRANSPARENT_SIZES = [16, 32, 48, 64, 128, 150, 200, 256, 400, 512, 800]
+
+BANNER_SIZE = (1500, 500)
+ICON_SIZE = (1000, 1000)
+
+# Logo box inside banners and icons (60% of the height)
+BANNER_LOGO = int(BANNER_SIZE[1] * 0.6)
+ICON_LOGO = int(ICON_SIZE[0] * 0.6)
+
+# Cost model, measured on a laptop: render + PNG encode + placeholder per
+# megapixel of output, downscaling per megapixel of source, PNG encode of the
+# embedded logo per megapixel for SVG markup, and optimization time per
+# kilobyte of SVG
+JOB_OVERHEAD_MS = 10
+MS_PER_MEGAPIXEL = 300
+RESIZE_MS_PER_MEGAPIXEL = 20
+EMBED_MS_PER_MEGAPIXEL = 180
+OPTIMIZE_MS_PER_KB = 0.4
+
+# Memory model: RGBA buffers alive at a job's peak (see the *_stages helpers)
+# plus the baseline of a worker process with PIL, NumPy and a renderer loaded
+BYTES_PER_PIXEL = 4
+WORKER_BASE_BYTES = 45 * 2**20
+
+# Design sources optimized in place by `svg` (see optimize_svg.DEFAULT_DIRS);
+# generated SVGs are optimized by AssetOutput as they are written
+SVG_DIRS = ["tos", "logo_ai"]
+
+# Raster icon kinds whose color variants are rendered together as one
+# N x H x W x 4 stack (generate_assets.render_icon_variants)
+BATCHED_KINDS = ('icon_circle', 'icon_square', 'icon_transparent')
+
+Job = namedtuple('Job', ['path', 'module', 'kind', 'args', 'size', 'estimate_ms', 'stages'])
+
+def pixels(size):
+    return size[0] * size[1]
+
+def raster_cost(size):
+    return JOB_OVERHEAD_MS + size[0] * size[1] / 1e6 * MS_PER_MEGAPIXEL
+
+def resize_cost(source_size, size):
+    return raster_cost(size) + source_size[0] * source_size[1] / 1e6 * RESIZE_MS_PER_MEGAPIXEL
+
+def embed_cost(logo_size):
+    return JOB_OVERHEAD_MS + logo_size * logo_size / 1e6 * EMBED_MS_PER_MEGAPIXEL
+
+def composite_stages(size, logo_size):
+    """Canvas, logo render + recolored copy, placeholder copy, PNG encode buffer"""
+    return (('canvas', pixels(size)), ('logo', 2 * logo_size ** 2),
+            ('placeholder', pixels(size)), ('encode', pixels(size)))
+
+def resize_stages(source_size, size):
+    """Decoded source + thumbnail copy, output, placeholder copy, PNG encode buffer"""
+    return (('source', 2 * pixels(source_size)), ('output', pixels(size)),
+            ('placeholder', pixels(size)), ('encode', pixels(size)))
+
+def embed_stages(logo_size):
+    """Logo render + recolored copy, PNG encode buffer, base64 markup"""
+    return (('logo', 2 * logo_size ** 2), ('encode', logo_size ** 2), ('markup', logo_size ** 2))
+
+def peak_bytes(job):
+    """Estimated peak memory of a worker while it renders job"""
+    return WORKER_BASE_BYTES + BYTES_PER_PIXEL * sum(count for _, count in job.stages)
+
+def batch_units(jobs):
+    """
+    Jobs grouped the way a worker renders them: all jobs of a batched kind
+    together, at the position of the first one, every other job alone
+    """
+    units = []
+    batches = {}
+    for job in jobs:
+        if job.kind not in BATCHED_KINDS:
+            units.append([job])
+            continue
+        if (job.module, job.kind) not in batches:
+            batches[job.module, job.kind] = []
+            units.append(batches[job.module, job.kind])
+        batches[job.module, job.kind].append(job)
+    return units
+
+def unit_peak_bytes(unit):
+    """Estimated peak memory of a worker rendering a unit; a batch also holds its N x H x W x 4 stack"""
+    peak = max(peak_bytes(job) for job in unit)
+    if unit[0].kind in BATCHED_KINDS:
+        peak += BYTES_PER_PIXEL * sum(pixels(job.size) for job in unit)
+    return peak
+
+def png_size(path):
+    """Pixel size read from the PNG header, without decoding"""
+    with open(path, 'rb') as f:
+        return struct.unpack('>II', f.read(24)[16:24])
+
+def plan_logos():
+    """logo/logo-*.png and logo/logo-transparent-*.png (generate_logos.py)"""
+    jobs = []
+    source = png_size(SOURCE_LOGO)
+    for size in LOGO_SIZES:
+        jobs.append(Job(os.path.join(LOGO_DIR, f"logo-{size}x{size}.png"), 'generate_logos', 'logo', (size,),
+                        (size, size), resize_cost(source, (size, size)), resize_stages(source, (size, size))))
+    jobs.append(Job(os.path.join(LOGO_DIR, "logo.png"), 'generate_logos', 'logo', ('full',), source,
+                    raster_cost(source), resize_stages(source, source)))
+
+    if not os.path.exists(SOURCE_LOGO_TRANSPARENT):
+        return jobs
+
+    for size in TRANSPARENT_SIZES:
+        jobs.append(Job(os.path.join(LOGO_DIR, f"logo-transparent-{size}x{size}.png"), 'generate_logos',
+                        'logo-transparent', (size,), (size, size), raster_cost((size, size)) * 2,
+                        composite_stages((size, size), size)))
+    full = png_size(SOURCE_LOGO_TRANSPARENT)
+    jobs.append(Job(os.path.join(LOGO_DIR, "logo-transparent.png"), 'generate_logos', 'logo-transparent',
+                    ('full',), full, raster_cost(full), resize_stages(full, full)))
+    return jobs
+
+def plan_banners():
+    """banners/png and banners/svg (generate_assets.py)"""
+    jobs = []
+    for filename, bg, logo_c, text_c in BANNER_VARIANTS:
+        jobs.append(Job(os.path.join(BANNERS_PNG_DIR, filename), 'generate_assets', 'banner',
+                        (bg, logo_c, text_c), BANNER_SIZE, raster_cost(BANNER_SIZE),
+                        composite_stages(BANNER_SIZE, BANNER_LOGO)))
+    for filename, bg, logo_c, text_c in SVG_BANNER_VARIANTS:
+        jobs.append(Job(os.path.join(BANNERS_SVG_DIR, filename), 'generate_assets', 'svg_banner',
+                        (bg, logo_c, text_c), BANNER_SIZE, embed_cost(BANNER_LOGO), embed_stages(BANNER_LOGO)))
+    return jobs
+
+def plan_icons():
+    """icons/png and icons/svg (generate_assets.py)"""
+    jobs = []
+    for shape in ('circle', 'square'):
+        for filename, bg, logo_c in ICON_VARIANTS:
+            jobs.append(Job(os.path.join(ICONS_PNG_DIR, shape, filename), 'generate_assets', f'icon_{shape}',
+                            (bg, logo_c), ICON_SIZE, raster_cost(ICON_SIZE), composite_stages(ICON_SIZE, ICON_LOGO)))
+    for filename, logo_c in TRANSPARENT_ICON_VARIANTS:
+        jobs.append(Job(os.path.join(ICONS_PNG_DIR, "transparent", filename), 'generate_assets',
+                        'icon_transparent', (logo_c,), ICON_SIZE, raster_cost(ICON_SIZE),
+                        composite_stages(ICON_SIZE, ICON_SIZE[0])))
+
+    for shape in ('circle', 'square'):
+        for filename, bg, logo_c in ICON_VARIANTS:
+            jobs.append(Job(os.path.join(ICONS_SVG_DIR, shape, filename.replace('.png', '.svg')), 'generate_assets',
+                            f'svg_icon_{shape}', (bg, logo_c), ICON_SIZE, embed_cost(ICON_LOGO),
+                            embed_stages(ICON_LOGO)))
+    for filename, logo_c in TRANSPARENT_ICON_VARIANTS:
+        jobs.append(Job(os.path.join(ICONS_SVG_DIR, "transparent", filename.replace('.png', '.svg')),
+                        'generate_assets', 'svg_icon_transparent', (logo_c,), ICON_SIZE,
+                        embed_cost(ICON_SIZE[0]), embed_stages(ICON_SIZE[0])))
+    return jobs
+
+def plan_svg():
+    """In-place optimization of the SVG design sources (optimize_svg.py)"""
+    jobs = []
+    for root in SVG_DIRS:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith('.svg'):
+                    path = os.path.join(dirpath, name)
+                    cost = JOB_OVERHEAD_MS + os.path.getsize(path) / 1024 * OPTIMIZE_MS_PER_KB
+                    jobs.append(Job(path, 'optimize_svg', 'optimize', (), None, cost, ()))
+    return jobs
+
+# Modules that run in the main process after all rendering; they
+# parallelize internally
+SERIAL_MODULES = ('optimize_svg',)
+
+# Subcommands of tos-assets. `svg` rewrites the design sources the renderers
+# read, so it only runs when asked for and is not part of `all`
+COMMANDS = {
+    'logos': [plan_logos],
+    'icons': [plan_icons],
+    'banners': [plan_banners],
+    'svg': [plan_svg],
+    'all': [plan_logos, plan_banners, plan_icons],
+}
+
+def plan(command):
+    """All jobs for a subcommand, in render order"""
+    return [job for planner in COMMANDS[command] for job in planner()]
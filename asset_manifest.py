@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Fingerprinted asset manifest for CDN publishing
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+
+from asset_writer import write_atomic
+
+# Repository root; manifest paths are relative to the manifest's directory,
+# which is the repository root for the shared manifest
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(REPO_ROOT, "manifest.json")
+MANIFEST_VERSION = 1
+
+# Hex digits of the content hash kept in fingerprinted filenames
+FINGERPRINT_LENGTH = 10
+
+# Directories that only separate formats of the same asset
+FORMAT_DIRS = {'png', 'svg', 'webp'}
+
+# MIME types for <picture> sources
+MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'webp': 'image/webp',
+    'jpg': 'image/jpeg',
+}
+
+def repo_path(path, root=REPO_ROOT):
+    """Normalize a path to be relative to the repository root (or another manifest root)"""
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, '/')
+
+def inside(path, root):
+    """Whether path resolves to a location under the directory root"""
+    root = os.path.realpath(root)
+    return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+def manifest_for(out_dir):
+    """
+    Manifest recording outputs written under out_dir: the shared one inside
+    the repository, else a manifest.json in out_dir itself
+    """
+    if inside(out_dir, REPO_ROOT):
+        return MANIFEST_PATH
+    return os.path.join(out_dir, os.path.basename(MANIFEST_PATH))
+
+def group_name(path):
+    """
+    Logical asset an output belongs to: format directories and size suffixes
+    are dropped, so banners/png/x.png and banners/svg/x.svg share "banners/x"
+    and logo/logo-16x16.png belongs to "logo/logo".
+    """
+    parts = [p for p in path.split('/') if p not in FORMAT_DIRS]
+    stem = os.path.splitext('/'.join(parts))[0]
+    return re.sub(r'-\d+x\d+$', '', stem)
+
+def fingerprint_name(path, digest):
+    """logo/logo-16x16.png -> logo/logo-16x16.<hash>.png"""
+    base, ext = os.path.splitext(path)
+    return f'{base}.{digest[:FINGERPRINT_LENGTH]}{ext}'
+
+def asset_entry(path, data, size=None, group=None, placeholder=None):
+    """Build the manifest record of one output (path relative to the repository)"""
+    digest = hashlib.sha256(data).hexdigest()
+    entry = {
+        'sha256': digest,
+        'bytes': len(data),
+        'format': os.path.splitext(path)[1][1:].lower(),
+        'fingerprint': fingerprint_name(path, digest),
+    }
+    if size is not None:
+        entry['width'], entry['height'] = size
+    entry['group'] = group if group is not None else group_name(path)
+    if placeholder is not None:
+        entry['placeholder'] = placeholder
+    return entry
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load a manifest, or an empty one if it does not exist yet"""
+    if not os.path.exists(path):
+        return {'version': MANIFEST_VERSION, 'assets': {}, 'groups': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def build_groups(assets):
+    """Group asset paths by logical asset, smallest first"""
+    groups = {}
+    for path, entry in assets.items():
+        if 'group' in entry:
+            groups.setdefault(entry['group'], []).append(path)
+    for paths in groups.values():
+        paths.sort(key=lambda p: (assets[p].get('width', 0), assets[p]['format'], p))
+    return dict(sorted(groups.items()))
+
+def update_manifest(entries, path=MANIFEST_PATH):
+    """Merge new entries into the manifest on disk, so every generator shares one file"""
+    manifest = load_manifest(path)
+    manifest['assets'].update(entries)
+    manifest['assets'] = dict(sorted(manifest['assets'].items()))
+    manifest['groups'] = build_groups(manifest['assets'])
+
+    write_atomic(path, (json.dumps(manifest, indent=2) + '\n').encode('utf-8'))
+    return manifest
+
+def srcset(manifest, group, fmt='png', base_url=''):
+    """Render the srcset attribute for all widths of a group in one format"""
+    items = []
+    for path in manifest['groups'][group]:
+        entry = manifest['assets'][path]
+        if entry['format'] == fmt and 'width' in entry:
+            items.append(f"{base_url}{entry['fingerprint']} {entry['width']}w")
+    return ', '.join(items)
+
+def picture_html(manifest, group, sizes='100vw', base_url='', alt=''):
+    """Render a <picture> element with one <source> per format of a group"""
+    paths = manifest['groups'][group]
+    formats = []
+    for path in paths:
+        fmt = manifest['assets'][path]['format']
+        if fmt not in formats:
+            formats.append(fmt)
+
+    lines = ['<picture>']
+    for fmt in formats:
+        if fmt == 'png':
+            continue
+        entry = next(manifest['assets'][p] for p in paths if manifest['assets'][p]['format'] == fmt)
+        src = srcset(manifest, group, fmt, base_url) if fmt != 'svg' else base_url + entry['fingerprint']
+        lines.append(f'  <source type="{MIME_TYPES.get(fmt, fmt)}" srcset="{html.escape(src)}" sizes="{sizes}">')
+
+    fallback_fmt = 'png' if 'png' in formats else formats[0]
+    fallback = [manifest['assets'][p] for p in paths if manifest['assets'][p]['format'] == fallback_fmt][-1]
+    attrs = f'src="{base_url}{fallback["fingerprint"]}"'
+    if fallback_fmt == 'png':
+        attrs += f' srcset="{html.escape(srcset(manifest, group, "png", base_url))}" sizes="{sizes}"'
+    if 'width' in fallback:
+        attrs += f' width="{fallback["width"]}" height="{fallback["height"]}"'
+    lines.append(f'  <img {attrs} alt="{html.escape(alt)}">')
+    lines.append('</picture>')
+    return '\n'.join(lines)
+
+def publish(manifest, output_dir, root=REPO_ROOT):
+    """
+    Copy every asset to its fingerprinted name under output_dir. Paths are
+    relative to root, the manifest's directory. Raises ValueError for an
+    entry whose target would land outside output_dir.
+    """
+    copied = 0
+    for path, entry in manifest['assets'].items():
+        source = os.path.join(root, path)
+        target = os.path.join(output_dir, entry['fingerprint'])
+        if not inside(target, output_dir):
+            raise ValueError(f"Refusing to publish {path}: {target} is outside {output_dir}")
+        if os.path.exists(target) or not os.path.exists(source):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+        copied += 1
+    return copied
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and publish the asset manifest")
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help="manifest file")
+    parser.add_argument('--publish', metavar='DIR', help="copy assets to DIR under fingerprinted names")
+    parser.add_argument('--html', metavar='GROUP', help="print a <picture> element for GROUP")
+    parser.add_argument('--base-url', default='', help="URL prefix for --html")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+
+    if args.html:
+        print(picture_html(manifest, args.html, base_url=args.base_url))
+    elif args.publish:
+        try:
+            copied = publish(manifest, args.publish, os.path.dirname(os.path.abspath(args.manifest)))
+        except ValueError as e:
+            parser.exit(1, f"Error: {e}\n")
+        print(f"Published {copied} new files to {args.publish}")
+        print("Fingerprinted names never change content: serve them with Cache-Control: public, max-age=31536000, immutable")
+    else:
+        for group, paths in manifest['groups'].items():
+            print(f"{group}: {len(paths)} files")
+        print(f"\n{len(manifest['assets'])} assets in {args.manifest}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Output sink shared by the generators: encodes, writes and records every asset
+"""
+
+import os
+
+import asset_manifest
+import build_cache
+import bundle
+import optimize_svg
+import placeholders
+from asset_writer import AssetWriter, write_atomic
+from dedup_assets import ContentStore
+
+# Environment variable pointing at a shared content-addressed store
+STORE_ENV = "TOS_ASSET_STORE"
+
+class AssetOutput:
+    """
+    Receives rendered assets from a generator, writes them to disk and
+    records them in the manifest. With a store directory, bytes go through
+    the content-addressed store so identical outputs are written once. With
+    a build cache, renders whose sources and parameters were seen before are
+    copied from the cache instead of being rendered again. With bundles,
+    encoded outputs are also streamed into release archives, optionally
+    instead of the directory tree. Files are written by a background
+    AssetWriter, so rendering continues while earlier outputs hit the disk.
+    """
+
+    def __init__(self, manifest_path=asset_manifest.MANIFEST_PATH, store_dir=None, cache=None,
+                 bundles=None, write_tree=None):
+        store_dir = store_dir or os.environ.get(STORE_ENV)
+        self.manifest_path = manifest_path
+        # Manifest and bundle paths are relative to the manifest's directory
+        self.root = os.path.dirname(os.path.abspath(manifest_path))
+        self.unrecorded = 0
+        self.store = ContentStore(store_dir) if store_dir else None
+        self.cache = cache if cache is not None else build_cache.open_cache()
+        self.bundles = bundles if bundles is not None else bundle.bundles_from_env()
+        if write_tree is None:
+            write_tree = not (self.bundles and os.environ.get(bundle.BUNDLE_ONLY_ENV) == '1')
+        self.write_tree = write_tree
+        self.writer = AssetWriter(self.store.write if self.store else write_atomic)
+        self.entries = {}
+
+    def save_image(self, img, path, group=None, profile=build_cache.DEFAULT_PROFILE):
+        """Encode an image (PNG or WebP, by extension) and write it, with a placeholder for the manifest"""
+        placeholder = placeholders.placeholder(img)
+        data = build_cache.encode_image(img, os.path.splitext(path)[1][1:].lower(), profile)
+        self.write(path, data, size=img.size, group=group, placeholder=placeholder)
+        return data, {'size': img.size, 'placeholder': placeholder}
+
+    def save_svg(self, svg, path, size=None, group=None):
+        """
+        Optimize SVG markup and write it, so the manifest, bundles and build
+        cache all hold the final bytes
+        """
+        data = optimize_svg.optimize_svg_text(svg).encode('utf-8')
+        self.write(path, data, size=size, group=group)
+        return data, {'size': size}
+
+    def render_image(self, path, sources, params, render, group=None, profile=build_cache.DEFAULT_PROFILE):
+        """
+        Write the image returned by render(), unless the build cache already
+        holds the output for these source files and parameters. Returns the
+        pixel size of the output.
+        """
+        return self._render(path, sources, params, group, lambda: self.save_image(render(), path, group, profile),
+                            profile)
+
+    def render_svg(self, path, sources, params, render, size=None, group=None):
+        """Write the SVG markup returned by render(), going through the build cache"""
+        return self._render(path, sources, params, group, lambda: self.save_svg(render(), path, size, group))
+
+    def render_key(self, path, sources, params, profile=None):
+        # The output format and encoder profile are part of every key, so
+        # callers cannot get PNG bytes back for a .webp path
+        return build_cache.cache_key(sources, [params, os.path.splitext(path)[1].lower(), profile])
+
+    def is_cached(self, path, sources, params, profile=build_cache.DEFAULT_PROFILE):
+        """Whether render_image would be served from the build cache, without counting a lookup"""
+        return self.cache is not None and self.cache.contains(self.render_key(path, sources, params, profile))
+
+    def _render(self, path, sources, params, group, save, profile=None):
+        if self.cache is None:
+            return save()[1]['size']
+
+        key = self.render_key(path, sources, params, profile)
+        cached = self.cache.get(key)
+        if cached is not None:
+            data, meta = cached
+            self.write(path, data, size=meta.get('size'), group=group, placeholder=meta.get('placeholder'))
+            return meta.get('size')
+
+        data, meta = save()
+        self.cache.put(key, data, meta)
+        return meta['size']
+
+    def write(self, path, data, size=None, group=None, placeholder=None):
+        """
+        Write encoded bytes to path and bundles, and record them in the
+        manifest. Outputs outside the manifest's directory are only written.
+        """
+        if not asset_manifest.inside(path, self.root):
+            self.unrecorded += 1
+            if self.write_tree:
+                self.writer.submit(path, data)
+            return
+
+        rel_path = asset_manifest.repo_path(path, self.root)
+        entry = asset_manifest.asset_entry(rel_path, data, size, group, placeholder)
+        self.entries[rel_path] = entry
+
+        for b in self.bundles:
+            if b.wants(rel_path):
+                b.add(rel_path, data, entry)
+
+        if not self.write_tree:
+            return
+
+        self.writer.submit(path, data)
+
+    def manifest_name(self):
+        if asset_manifest.inside(self.manifest_path, asset_manifest.REPO_ROOT):
+            return asset_manifest.repo_path(self.manifest_path)
+        return self.manifest_path
+
+    def flush(self):
+        """Wait until every output written so far is on disk"""
+        self.writer.flush()
+
+    def close(self):
+        """Finish pending writes and merge this run's entries into the manifest"""
+        self.writer.close()
+        if self.writer.written or self.writer.unchanged:
+            print(f"\nWrote {self.writer.written} files, {self.writer.unchanged} unchanged")
+
+        # SVGs reuse the placeholder of a raster rendering of the same asset
+        by_group = {e['group']: e['placeholder'] for e in self.entries.values() if 'placeholder' in e}
+        for entry in self.entries.values():
+            if 'placeholder' not in entry and entry['group'] in by_group:
+                entry['placeholder'] = by_group[entry['group']]
+
+        for b in self.bundles:
+            b.close(asset_manifest.MANIFEST_VERSION)
+
+        if self.entries and self.write_tree:
+            asset_manifest.update_manifest(self.entries, self.manifest_path)
+            print(f"\nManifest: {len(self.entries)} assets recorded in {self.manifest_name()}")
+        if self.unrecorded:
+            print(f"Note: {self.unrecorded} outputs outside {self.root} were not recorded in the manifest")
+        if self.cache is not None:
+            print(self.cache.report())
@@ -0,0 +1,90 @@
+"""
+Background writer stage: encoded outputs are written from a thread pool with
+temp file + atomic rename, so rendering overlaps with disk I/O and an
+interrupted run never leaves a truncated asset behind
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+# Writer threads
+WRITER_THREADS = 4
+
+# Writes queued before submit() blocks, bounding the memory held by pending bytes
+MAX_PENDING = 32
+
+def temp_path(path):
+    """Temporary sibling of path, unique per process and thread"""
+    return f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+def same_contents(path, data):
+    """Check whether path already holds exactly these bytes"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def write_atomic(path, data):
+    """
+    Write bytes to path through a temporary file and an atomic rename.
+    Returns False, without touching the file, when it already holds the bytes.
+    """
+    if same_contents(path, data):
+        return False
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+class AssetWriter:
+    """
+    Queue of (path, bytes) writes drained by a thread pool. write_file(path,
+    data) does the actual write and returns whether the file changed; the
+    default is write_atomic. Directories are created once, on the submitting
+    thread, the first time a path in them is queued.
+    """
+
+    def __init__(self, write_file=write_atomic, threads=WRITER_THREADS):
+        self.write_file = write_file
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asset-writer')
+        self.slots = threading.BoundedSemaphore(MAX_PENDING)
+        self.dirs = set()
+        self.futures = []
+        self.written = 0
+        self.unchanged = 0
+
+    def submit(self, path, data):
+        """Queue bytes for path; blocks while MAX_PENDING writes are in flight"""
+        directory = os.path.dirname(path) or '.'
+        if directory not in self.dirs:
+            os.makedirs(directory, exist_ok=True)
+            self.dirs.add(directory)
+
+        self.slots.acquire()
+        future = self.pool.submit(self.write_file, path, data)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+
+    def flush(self):
+        """Wait for all queued writes; re-raises the first failed write"""
+        futures, self.futures = self.futures, []
+        for future in futures:
+            if future.result():
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def close(self):
+        """Flush and stop the writer threads"""
+        self.flush()
+        self.pool.shutdown(wait=True)
@@ -6,6 +6,10 @@ Replace TOS logo in banners and add TOS Network text
 from PIL import Image, ImageDraw, ImageFont
 import os
 import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from asset_output import AssetOutput
 
 # Configuration
 BANNER_SIZE = None  # Will be calculated based on content
@@ -130,6 +134,7 @@ def main():
 
     logo = load_logo(new_logo_path)
     print(f"Loaded new logo: {new_logo_path}")
+    output = AssetOutput()
 
     # Process each banner
     for name, (bg_color, text_color) in BACKGROUND_COLORS.items():
@@ -138,7 +143,7 @@ def main():
 
         # Save PNG
         output_path = f'png/{name}.png'
-        banner.save(output_path, 'PNG')
+        output.save_image(banner, output_path)
         print(f"  Saved: {output_path}")
 
     # Process gradient background banners
@@ -146,9 +151,10 @@ def main():
         print(f"Processing: {name}")
         banner = create_banner(logo, None, 'white', name)
         output_path = f'png/{name}.png'
-        banner.save(output_path, 'PNG')
+        output.save_image(banner, output_path)
         print(f"  Saved: {output_path}")
 
+    output.close()
     print("\nAll PNG banners generated successfully!")
     print("\nNote: SVG files should be manually processed using design software due to complexity.")
     print("You can refer to the generated PNG files to manually update SVG.")
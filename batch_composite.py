@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Batched compositing: all color variants of an icon are produced as one
+N x H x W x 4 array, with the same integer blending as PIL's paste, so
+every slice is byte-identical to rendering that variant on its own
+"""
+
+from PIL import Image, ImageDraw
+import argparse
+import time
+
+import numpy as np
+
+def div255(values):
+    """x / 255 rounded the way PIL's blending does it"""
+    values = values + 128
+    return ((values >> 8) + values) >> 8
+
+def pack(pixels):
+    """... x 4 uint8 RGBA -> ... uint32, one word per pixel"""
+    return np.ascontiguousarray(pixels, np.uint8).view(np.uint32)[..., 0]
+
+def unpack(packed):
+    """... uint32 -> ... x 4 uint8 RGBA view"""
+    return packed[..., None].view(np.uint8)
+
+def colorize_lut(colors):
+    """Colorized pixel for every alpha value: N x 256 packed"""
+    alpha = np.arange(256, dtype=np.uint16)[None, :, None]
+    return pack(div255(np.array(colors, np.uint16)[:, None, :] * alpha).astype(np.uint8))
+
+def blend_lut(backgrounds, colors):
+    """
+    Result of pasting a colorized pixel of each alpha value onto the
+    transparent canvas (index a) or the background (index 256 + a): N x 512 packed
+    """
+    alpha = np.arange(256, dtype=np.uint16)[None, :, None]
+    fg = div255(np.array(colors, np.uint16)[:, None, :] * alpha) * alpha
+    base = np.array(backgrounds, np.uint16)[:, None, :] * (255 - alpha)
+    return pack(np.concatenate([div255(fg), div255(base + fg)], axis=1).astype(np.uint8))
+
+def colorize_stack(logo, colors):
+    """
+    The logo (H x W x 4) in each color, keeping its alpha: N x H x W x 4.
+    A color of None keeps the logo's own colors.
+    """
+    stack = np.empty((len(colors),) + logo.shape[:2], np.uint32)
+    solid = [i for i, color in enumerate(colors) if color is not None]
+    if solid:
+        stack[solid] = colorize_lut([colors[i] for i in solid])[:, logo[..., 3]]
+    for i, color in enumerate(colors):
+        if color is None:
+            stack[i] = pack(logo)
+    return unpack(stack)
+
+def shape_mask(shape, size):
+    """Background coverage of an icon shape: 'circle' or 'square'"""
+    if shape == 'square':
+        return np.full((size, size), True)
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, size-1, size-1], fill=255)
+    return np.asarray(mask) > 0
+
+def composite_stack(backgrounds, mask, logo, colors, size, position=None):
+    """
+    Fill the mask with each background color and paste the logo (H x W x 4)
+    at position (default: centered) in the matching color, all variants at once:
+    N x size x size x 4. Solid colors depend only on the alpha of a pixel
+    and whether it is on the background, so they are looked up in a table;
+    a color of None pastes the logo's own colors.
+    """
+    stack = np.empty((len(colors), size, size), np.uint32)
+    coverage = np.where(mask, np.uint32(0xFFFFFFFF), np.uint32(0))
+    for i, background in enumerate(pack(np.array(backgrounds, np.uint8))):
+        np.bitwise_and(coverage, background, out=stack[i])
+
+    height, width = logo.shape[:2]
+    x, y = position or ((size - width) // 2, (size - height) // 2)
+    solid = [i for i, color in enumerate(colors) if color is not None]
+    if solid:
+        index = logo[..., 3] + 256 * mask[y:y+height, x:x+width].astype(np.intp)
+        lut = blend_lut([backgrounds[i] for i in solid], [colors[i] for i in solid])
+        for row, i in zip(lut, solid):
+            np.take(row, index, out=stack[i, y:y+height, x:x+width], mode='wrap')
+
+    alpha = logo[..., 3:4].astype(np.uint16)
+    for i, color in enumerate(colors):
+        if color is None:
+            region = unpack(stack[i, y:y+height, x:x+width]).astype(np.uint16)
+            blended = div255(region * (255 - alpha) + logo * alpha).astype(np.uint8)
+            stack[i, y:y+height, x:x+width] = pack(blended)
+    return unpack(stack)
+
+def benchmark(counts, size=1000, logo_size=600):
+    """Per-variant cost of batched compositing against one PIL render per variant"""
+    rng = np.random.default_rng(0)
+    logo = rng.integers(0, 256, (logo_size, logo_size, 4), dtype=np.uint8)
+    logo_img = Image.fromarray(logo, 'RGBA')
+    mask = shape_mask('circle', size)
+
+    for count in counts:
+        colors = [tuple(int(v) for v in rng.integers(0, 256, 3)) + (255,) for _ in range(count)]
+
+        start = time.perf_counter()
+        for bg, fg in zip(colors, reversed(colors)):
+            icon = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            ImageDraw.Draw(icon).ellipse([0, 0, size-1, size-1], fill=bg)
+            layer = Image.new('RGBA', logo_img.size, (0, 0, 0, 0))
+            layer.paste(Image.new('RGBA', logo_img.size, fg), (0, 0), logo_img.getchannel('A'))
+            icon.paste(layer, ((size - logo_size) // 2,) * 2, layer)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        composite_stack(colors, mask, logo, colors[::-1], size)
+        batched = time.perf_counter() - start
+        print(f"  {count:>3} variants: {single / count * 1000:6.1f} ms/variant separately, "
+              f"{batched / count * 1000:6.1f} ms/variant batched")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched icon compositing")
+    parser.add_argument('--counts', default='1,6,24', help="comma-separated numbers of color variants")
+    args = parser.parse_args()
+    benchmark([int(c) for c in args.counts.split(',')])
+
+if __name__ == "__main__":
+    main()
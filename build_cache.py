@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Shared build cache for rendered assets, usable from a directory or over HTTP
+"""
+
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from io import BytesIO
+import urllib.request
+import urllib.error
+import argparse
+from importlib import metadata
+import functools
+import hashlib
+import json
+import os
+import zlib
+
+import PIL
+from PIL import Image
+
+# Bump when a change to the generators alters their output
+PIPELINE_VERSION = 4
+
+
+# Environment variable with the cache location (directory or http:// URL)
+CACHE_ENV = "TOS_BUILD_CACHE"
+
+# Encoder settings per compression profile; "lossless" is what the generators
+# commit. PNG "colors" quantizes to a palette before encoding.
+ENCODE_PROFILES = {
+    'lossless': {
+        'png': {'compress_level': 9},
+        'webp': {'lossless': True, 'quality': 80, 'method': 4, 'exact': True},
+    },
+    'fast': {
+        'png': {'compress_level': 1},
+        'webp': {'lossless': True, 'quality': 0, 'method': 0, 'exact': True},
+    },
+    'web': {
+        'png': {'compress_level': 9, 'colors': 256},
+        'webp': {'quality': 82, 'method': 4},
+    },
+}
+DEFAULT_PROFILE = 'lossless'
+
+# PNG chunks kept by the canonical encoder, in this order
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_KEPT_CHUNKS = [b'IHDR', b'PLTE', b'tRNS', b'IDAT', b'IEND']
+
+def png_chunks(data):
+    """Split PNG bytes into (type, payload) chunks"""
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], 'big')
+        chunk_type = data[pos + 4:pos + 8]
+        yield chunk_type, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+def png_chunk(chunk_type, payload):
+    """Serialize one PNG chunk"""
+    crc = zlib.crc32(chunk_type + payload)
+    return len(payload).to_bytes(4, 'big') + chunk_type + payload + crc.to_bytes(4, 'big')
+
+def canonical_png(data):
+    """
+    Keep only the chunks needed to decode the image, in canonical order, with
+    all IDAT data in a single chunk. Text, time, gamma, ICC and pHYs metadata
+    are dropped.
+    """
+    chunks = {}
+    for chunk_type, payload in png_chunks(data):
+        if chunk_type in PNG_KEPT_CHUNKS:
+            chunks[chunk_type] = chunks.get(chunk_type, b'') + payload
+    chunks[b'IEND'] = b''
+    return PNG_SIGNATURE + b''.join(png_chunk(t, chunks[t]) for t in PNG_KEPT_CHUNKS if t in chunks)
+
+def encode_png(img, compress_level=9, colors=None):
+    """Encode an image as PNG with pinned settings and no metadata"""
+    if colors:
+        img = img.quantize(colors, method=Image.Quantize.FASTOCTREE if img.mode == 'RGBA' else None)
+    buffered = BytesIO()
+    img.save(buffered, 'PNG', compress_level=compress_level)
+    return canonical_png(buffered.getvalue())
+
+def encode_image(img, fmt='png', profile=DEFAULT_PROFILE):
+    """Encode an image in the given format with the pinned settings of a compression profile"""
+    if fmt not in ENCODE_PROFILES[profile]:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    settings = ENCODE_PROFILES[profile][fmt]
+    if fmt == 'png':
+        return encode_png(img, **settings)
+    buffered = BytesIO()
+    img.save(buffered, 'WEBP', **settings)
+    return buffered.getvalue()
+
+@functools.lru_cache(maxsize=None)
+def source_digest(path):
+    """Hash of a source file, computed once per run"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def package_version(name):
+    """Installed version of a distribution, or '' when unknown"""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ''
+
+@functools.lru_cache(maxsize=None)
+def renderer_version():
+    """
+    Everything besides sources and parameters that affects output bytes:
+    the pipeline, Pillow, and the SVG, PDF and EPS rasterizers in use
+    """
+    import masters
+    import svg_render
+
+    gs = masters.ghostscript()
+    backends = [('svg', svg_render.svg_backend()), ('pdf', masters.pdf_backend()),
+                ('eps', ('ghostscript', gs[1]) if gs else None)]
+    parts = [f"tos-assets/{PIPELINE_VERSION}", f"pillow/{PIL.__version__}"]
+    parts += [f"{kind}/{backend[0]}-{backend[1]}" if backend else f"{kind}/none" for kind, backend in backends]
+    return ' '.join(parts)
+
+def cache_key(sources, params):
+    """Hash of (source bytes, variant parameters, renderer version)"""
+    payload = json.dumps({
+        'sources': [source_digest(p) for p in sources],
+        'params': params,
+        'renderer': renderer_version(),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BuildCache:
+    """
+    Maps cache keys to encoded output bytes plus their manifest metadata.
+    The location is either a directory (local or network mount) or the URL
+    of a server started with `build_cache.py serve`.
+    """
+
+    def __init__(self, location):
+        self.location = location.rstrip('/')
+        self.remote = location.startswith(('http://', 'https://'))
+        self.hits = 0
+        self.misses = 0
+        self.bytes_fetched = 0
+
+    def _object(self, key, suffix):
+        return f'{key[:2]}/{key}{suffix}'
+
+    def _read(self, name):
+        if self.remote:
+            try:
+                with urllib.request.urlopen(f'{self.location}/{name}') as response:
+                    return response.read()
+            except urllib.error.HTTPError as e:
+                if e.code == 404:
+                    return None
+                raise
+        path = os.path.join(self.location, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def _exists(self, name):
+        if self.remote:
+            request = urllib.request.Request(f'{self.location}/{name}', method='HEAD')
+            try:
+                urllib.request.urlopen(request).close()
+                return True
+            except urllib.error.HTTPError as e:
+                if e.code == 404:
+                    return False
+                raise
+        return os.path.exists(os.path.join(self.location, name))
+
+    def _write(self, name, data):
+        if self.remote:
+            request = urllib.request.Request(f'{self.location}/{name}', data=data, method='PUT')
+            urllib.request.urlopen(request).close()
+            return
+        path = os.path.join(self.location, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        """Return (data, meta) for a key, or None on a miss"""
+        meta = self._read(self._object(key, '.json'))
+        data = self._read(self._object(key, '')) if meta is not None else None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_fetched += len(data)
+        return data, json.loads(meta)
+
+    def contains(self, key):
+        """Whether a key is cached, without counting a hit or miss"""
+        return self._exists(self._object(key, '.json'))
+
+    def put(self, key, data, meta):
+        """Store output bytes; metadata is written last so readers never see half an entry"""
+        self._write(self._object(key, ''), data)
+        self._write(self._object(key, '.json'), json.dumps(meta).encode('utf-8'))
+
+    def report(self):
+        """One-line hit rate summary for the end of a run"""
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0
+        return (f"Build cache {self.location}: {self.hits}/{lookups} hits ({rate:.0f}%), "
+                f"{self.bytes_fetched} bytes fetched")
+
+def open_cache(location=None):
+    """Open the cache configured by argument or environment, if any"""
+    location = location or os.environ.get(CACHE_ENV)
+    return BuildCache(location) if location else None
+
+def local_cache(name):
+    """
+    The cache configured by environment, else the per-user cache directory
+    for name (e.g. ~/.cache/tos-assets/masters)
+    """
+    root = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return open_cache() or BuildCache(os.path.join(root, 'tos-assets', name))
+
+class CacheRequestHandler(SimpleHTTPRequestHandler):
+    """Static file server that also accepts PUT uploads"""
+
+    def do_PUT(self):
+        path = self.translate_path(self.path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        length = int(self.headers['Content-Length'])
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.rfile.read(length))
+        os.replace(tmp_path, path)
+        self.send_response(201)
+        self.end_headers()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a build cache directory over HTTP")
+    parser.add_argument('command', choices=['serve'])
+    parser.add_argument('directory', help="cache directory")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    handler = functools.partial(CacheRequestHandler, directory=args.directory)
+    print(f"Serving build cache {args.directory} on http://localhost:{args.port}")
+    print(f"Point generators at it with: export {CACHE_ENV}=http://localhost:{args.port}")
+    HTTPServer(('', args.port), handler).serve_forever()
+
+if __name__ == "__main__":
+    main()
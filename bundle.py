@@ -0,0 +1,161 @@
+"""
+Release bundles (zip / tar.*) written straight from the render pipeline
+"""
+
+import fnmatch
+import gzip
+import json
+import lzma
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+# Environment variables configuring bundles for the generators
+BUNDLE_ENV = "TOS_BUNDLE"            # e.g. "web=dist/web.zip,ios=dist/ios.tar.zst"
+BUNDLE_ONLY_ENV = "TOS_BUNDLE_ONLY"  # set to 1 to skip writing the directory tree
+
+# Which outputs go into each platform bundle
+BUNDLE_PROFILES = {
+    'web': ['*'],
+    'ios': ['*.png'],
+    'android': ['*.png'],
+    'all': ['*'],
+}
+
+MANIFEST_NAME = "manifest.json"
+
+# Fixed timestamps keep bundles byte-reproducible
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Formats that are already compressed and are stored as-is in zips
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gz', '.br')
+
+def tar_member(name, data):
+    """Serialize one regular file as tar header + padded data"""
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    info.mtime = 0
+    return info.tobuf(tarfile.PAX_FORMAT) + data + b'\0' * (-len(data) % tarfile.BLOCKSIZE)
+
+def zip_write(archive, name, data):
+    """Add one file to a zip with fixed metadata; already compressed formats are stored"""
+    info = zipfile.ZipInfo(name, ZIP_DATE_TIME)
+    info.external_attr = 0o644 << 16
+    if name.lower().endswith(STORED_EXTENSIONS):
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    archive.writestr(info, data)
+
+def copy_bytes(src, dst, length, chunk_size=2**20):
+    """Copy exactly length bytes between file objects"""
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            raise IOError("Bundle spool ended early")
+        dst.write(chunk)
+        length -= len(chunk)
+
+def open_compressed(path):
+    """Open the compressed output stream for a tar bundle"""
+    if path.endswith('.tar'):
+        return open(path, 'wb')
+    if path.endswith(('.tar.gz', '.tgz')):
+        return gzip.GzipFile(path, 'wb', compresslevel=9, mtime=0)
+    if path.endswith('.tar.xz'):
+        return lzma.open(path, 'wb')
+    if path.endswith('.tar.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstandard module not found. Please run: pip install zstandard")
+        return zstandard.ZstdCompressor(level=19).stream_writer(open(path, 'wb'), closefd=True)
+    raise ValueError(f"Unsupported bundle format: {path}")
+
+class Bundle:
+    """
+    One release archive. Outputs are added as soon as they are encoded; the
+    manifest of everything added becomes the first entry when the bundle is
+    closed.
+
+    Outputs are appended to a spool and copied behind the manifest on
+    close: tar members uncompressed, for a single compression pass, and zip
+    entries as finished local entries, whose central directory records are
+    shifted by the manifest's length.
+    """
+
+    def __init__(self, path, patterns=('*',)):
+        self.path = path
+        self.patterns = patterns
+        self.entries = {}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self.spool = tempfile.TemporaryFile(dir=os.path.dirname(path) or '.')
+        self.zip = zipfile.ZipFile(self.spool, 'w') if path.endswith('.zip') else None
+
+    def wants(self, name):
+        return any(fnmatch.fnmatch(name, p) for p in self.patterns)
+
+    def add(self, name, data, entry):
+        """Add an encoded output under its repository path"""
+        self.entries[name] = entry
+        if self.zip is not None:
+            zip_write(self.zip, name, data)
+        else:
+            self.spool.write(tar_member(name, data))
+
+    def close(self, manifest_version):
+        """Write the manifest and finish the archive"""
+        manifest = json.dumps({'version': manifest_version, 'assets': dict(sorted(self.entries.items()))},
+                              indent=2).encode('utf-8')
+
+        if self.zip is not None:
+            self._close_zip(manifest)
+        else:
+            with open_compressed(self.path) as out:
+                out.write(tar_member(MANIFEST_NAME, manifest))
+                self.spool.seek(0)
+                shutil.copyfileobj(self.spool, out)
+                out.write(b'\0' * (2 * tarfile.BLOCKSIZE))
+            self.spool.close()
+
+        print(f"Bundle: {len(self.entries)} assets written to {self.path}")
+
+    def _close_zip(self, manifest):
+        # Spooled local entries end where the spool's central directory would start
+        spooled = self.zip.infolist()
+        end = self.zip.start_dir
+        self.zip.close()
+
+        with zipfile.ZipFile(self.path, 'w') as out:
+            zip_write(out, MANIFEST_NAME, manifest)
+            offset = out.fp.tell()
+            self.spool.seek(0)
+            copy_bytes(self.spool, out.fp, end)
+            for info in spooled:
+                info.header_offset += offset
+                out.filelist.append(info)
+                out.NameToInfo[info.filename] = info
+            out.start_dir = out.fp.tell()
+        self.spool.close()
+
+def parse_bundle_spec(spec):
+    """
+    Parse "web=dist/web.zip,ios=dist/ios.tar.zst" into bundles. A bare path
+    bundles everything.
+    """
+    bundles = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        profile, _, path = item.rpartition('=')
+        bundles.append(Bundle(path, BUNDLE_PROFILES[profile or 'all']))
+    return bundles
+
+def bundles_from_env():
+    """Bundles configured through the environment, if any"""
+    return parse_bundle_spec(os.environ.get(BUNDLE_ENV, ''))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Find duplicate and near-duplicate assets and keep a content-addressed store
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+from asset_writer import temp_path, write_atomic
+
+# Directories scanned by default
+ASSET_DIRS = ["logo", "tos", "logo_ai", "icons", "banners", "media"]
+
+# File types considered assets
+ASSET_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.svg', '.ai', '.eps')
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Max differing bits (out of 64) for two images to count as near-duplicates
+NEAR_DUPLICATE_DISTANCE = 6
+
+def file_digest(data):
+    """Content hash used for exact duplicates and store addresses"""
+    return hashlib.sha256(data).hexdigest()
+
+def perceptual_hash(path):
+    """
+    64-bit difference hash of an image. Transparent pixels are flattened on
+    gray so a logo and its background-less copy still look alike.
+    """
+    from PIL import Image
+
+    img = Image.open(path)
+    size = img.size
+    img.draft('L', (64, 64))
+    img = img.convert('RGBA')
+    flat = Image.new('RGBA', img.size, (128, 128, 128, 255))
+    flat.alpha_composite(img)
+    small = flat.convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f'{bits:016x}', size
+
+def hash_asset(path):
+    """Build the index record for one asset"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    record = {'path': path, 'bytes': len(data), 'sha256': file_digest(data)}
+    if path.lower().endswith(RASTER_EXTENSIONS):
+        record['phash'], record['size'] = perceptual_hash(path)
+    return record
+
+def find_assets(paths):
+    """Expand files and directories into a sorted list of asset files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                files.extend(os.path.join(dirpath, n) for n in filenames
+                             if n.lower().endswith(ASSET_EXTENSIONS))
+        elif path.lower().endswith(ASSET_EXTENSIONS):
+            files.append(path)
+    return sorted(files)
+
+def build_index(paths, jobs=None):
+    """Hash every asset in parallel"""
+    files = find_assets(paths)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(hash_asset, files, chunksize=4))
+
+def duplicate_groups(index):
+    """Group records with identical bytes"""
+    by_digest = {}
+    for record in index:
+        by_digest.setdefault(record['sha256'], []).append(record)
+    return [group for group in by_digest.values() if len(group) > 1]
+
+def hamming(a, b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+def same_aspect(a, b):
+    """Check that two image sizes have (almost) the same aspect ratio"""
+    return abs(a[0] * b[1] - a[1] * b[0]) <= 0.01 * max(a[0] * b[1], a[1] * b[0])
+
+def near_duplicate_groups(index, max_distance=NEAR_DUPLICATE_DISTANCE):
+    """
+    Group images that look alike but differ in bytes (other sizes, re-exports).
+    Exact duplicates are collapsed to one representative first.
+    """
+    unique = {}
+    for record in index:
+        if 'phash' in record:
+            unique.setdefault(record['sha256'], record)
+    records = list(unique.values())
+
+    parent = list(range(len(records)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, a in enumerate(records):
+        for j in range(i + 1, len(records)):
+            b = records[j]
+            if same_aspect(a['size'], b['size']) and hamming(a['phash'], b['phash']) <= max_distance:
+                parent[find(i)] = find(j)
+
+    groups = {}
+    for i, record in enumerate(records):
+        groups.setdefault(find(i), []).append(record)
+    return [group for group in groups.values() if len(group) > 1]
+
+def print_report(index, exact, near):
+    """Print duplicate groups and the bytes they waste"""
+    total = sum(r['bytes'] for r in index)
+    print(f"Indexed {len(index)} assets, {total} bytes")
+
+    print(f"\nExact duplicates: {len(exact)} groups")
+    wasted = 0
+    for group in exact:
+        savings = group[0]['bytes'] * (len(group) - 1)
+        wasted += savings
+        print(f"  {group[0]['sha256'][:12]}  saves {savings} bytes")
+        for record in group:
+            print(f"    {record['path']}")
+    print(f"  Total reclaimable: {wasted} bytes")
+
+    print(f"\nNear duplicates: {len(near)} groups")
+    for group in near:
+        group = sorted(group, key=lambda r: -r['bytes'])
+        extra = sum(r['bytes'] for r in group[1:])
+        print(f"  {len(group)} images, {extra} bytes besides the largest")
+        for record in group:
+            print(f"    {record['path']}  {record['size'][0]}x{record['size'][1]}  {record['bytes']} bytes")
+
+class ContentStore:
+    """
+    Content-addressed object store. Objects live at objects/ab/abcdef... and
+    outputs are hard-linked (or copied) from there, so identical bytes are
+    stored and written once.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def has(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put(self, data):
+        """Store bytes and return their digest; existing objects are not rewritten"""
+        digest = file_digest(data)
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, data)
+        return digest
+
+    def materialize(self, digest, path):
+        """
+        Place a stored object at path, skipping it when path already matches.
+        The link (or copy) is made under a temporary name and renamed over
+        path, so path is never missing or partially written.
+        """
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                if file_digest(f.read()) == digest:
+                    return False
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = temp_path(path)
+        try:
+            os.link(self.object_path(digest), tmp_path)
+        except OSError:
+            shutil.copyfile(self.object_path(digest), tmp_path)
+        os.replace(tmp_path, path)
+        return True
+
+    def write(self, path, data):
+        """Store bytes and materialize them at path; returns True if path changed"""
+        return self.materialize(self.put(data), path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report duplicate assets")
+    parser.add_argument('paths', nargs='*', default=ASSET_DIRS,
+                        help="asset files or directories (default: %(default)s)")
+    parser.add_argument('--distance', type=int, default=NEAR_DUPLICATE_DISTANCE,
+                        help="max perceptual hash distance for near-duplicates")
+    parser.add_argument('--index', help="write the hash index as JSON to this file")
+    parser.add_argument('--store', help="ingest every asset into a content-addressed store here")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="parallel worker processes")
+    args = parser.parse_args()
+
+    index = build_index(args.paths, args.jobs)
+    print_report(index, duplicate_groups(index), near_duplicate_groups(index, args.distance))
+
+    if args.index:
+        with open(args.index, 'w') as f:
+            json.dump(index, f, indent=2)
+        print(f"\nIndex written to {args.index}")
+
+    if args.store:
+        store = ContentStore(args.store)
+        stored = 0
+        for record in index:
+            if not store.has(record['sha256']):
+                with open(record['path'], 'rb') as f:
+                    store.put(f.read())
+                stored += record['bytes']
+        print(f"\nStore {args.store}: {stored} new bytes for {sum(r['bytes'] for r in index)} bytes of assets")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Derive resized variants of arbitrary images: every file matching a glob is
+rendered at each size of a recipe, in each format, through the build cache
+and into the asset manifest, on a pool of worker processes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque, namedtuple
+from PIL import Image, ImageOps
+import argparse
+import glob
+import json
+import os
+
+import asset_manifest
+import build_cache
+import scheduler
+from asset_output import AssetOutput
+
+# Sizes, fit mode, output formats and compression profile for each derived image
+Recipe = namedtuple('Recipe', ['sizes', 'fit', 'formats', 'profile'])
+
+# contain: fit inside the box, never upscaled (the logo resizer)
+# cover: fill the box exactly, cropping the overflow
+# pad: fit inside the box and center it on a transparent canvas of the box size
+FIT_MODES = ('contain', 'cover', 'pad')
+
+# Named recipes for --recipe; a JSON file with the same keys works too
+RECIPES = {
+    'logo': {'sizes': ['16', '32', '64', '128', '256', '512', '1024'], 'fit': 'contain',
+             'formats': ['png'], 'profile': 'lossless'},
+    'web': {'sizes': ['640', '1280', '1920'], 'fit': 'contain', 'formats': ['webp', 'png'], 'profile': 'web'},
+    'thumbnails': {'sizes': ['128x128', '256x256'], 'fit': 'cover', 'formats': ['webp'], 'profile': 'web'},
+}
+
+DEFAULT_OUT = 'derived'
+
+# Files in flight per worker; bounds memory when streaming through large directories
+QUEUE_PER_WORKER = 2
+
+RESAMPLE = Image.Resampling.LANCZOS
+
+def parse_size(spec):
+    """'256' -> (256, 256), '1500x500' -> (1500, 500)"""
+    width, _, height = str(spec).lower().partition('x')
+    return int(width), int(height or width)
+
+def make_recipe(sizes, fit, formats, profile):
+    if fit not in FIT_MODES:
+        raise ValueError(f"Unknown fit mode {fit!r}, expected one of {', '.join(FIT_MODES)}")
+    if profile not in build_cache.ENCODE_PROFILES:
+        raise ValueError(f"Unknown compression profile {profile!r}")
+    for fmt in formats:
+        if fmt not in build_cache.ENCODE_PROFILES[profile]:
+            raise ValueError(f"Unsupported image format: {fmt}")
+    return Recipe(tuple(parse_size(s) for s in sizes), fit, tuple(formats), profile)
+
+def load_recipe(name_or_path):
+    """Recipe settings by name, or from a JSON file"""
+    if name_or_path in RECIPES:
+        return dict(RECIPES[name_or_path])
+    with open(name_or_path) as f:
+        return json.load(f)
+
+def fit_image(image, box, fit='contain', resample=RESAMPLE):
+    """Resize an image into a (width, height) box with the given fit mode"""
+    if fit == 'cover':
+        return ImageOps.fit(image, box, resample)
+
+    img = image.copy()
+    img.thumbnail(box, resample)
+    if fit == 'pad':
+        canvas = Image.new('RGBA', box, (0, 0, 0, 0))
+        img = img.convert('RGBA')
+        canvas.paste(img, ((box[0] - img.width) // 2, (box[1] - img.height) // 2), img)
+        return canvas
+    return img
+
+def load_image(path):
+    """Decode a source image upright, as RGB or RGBA"""
+    img = ImageOps.exif_transpose(Image.open(path))
+    if img.mode in ('RGB', 'RGBA'):
+        return img
+    has_alpha = img.mode in ('LA', 'PA') or 'transparency' in img.info
+    return img.convert('RGBA' if has_alpha else 'RGB')
+
+def output_path(path, box, fmt, out_dir):
+    """
+    media/a.png -> derived/media/a-640x640.webp. Sources outside the working
+    directory are mirrored by their absolute path, so outputs never escape out_dir.
+    """
+    stem = os.path.splitext(os.path.abspath(path))[0]
+    cwd = os.getcwd()
+    if os.path.commonpath([cwd, stem]) == cwd:
+        stem = os.path.relpath(stem, cwd)
+    else:
+        stem = os.path.splitdrive(stem)[1].lstrip(os.sep)
+    return os.path.join(out_dir, f"{stem}-{box[0]}x{box[1]}.{fmt}")
+
+def derive_file(path, recipe, out_dir, output=None):
+    """
+    Render all variants of one file. The source is decoded, and each size
+    resized, only when a variant misses the build cache. Without an output,
+    runs as a worker and returns the recorded outputs for the parent.
+    """
+    worker = output is None
+    if worker:
+        output = scheduler.RecordingOutput()
+
+    source = []
+    fitted = {}
+
+    def render(box):
+        if box not in fitted:
+            if not source:
+                source.append(load_image(path))
+            fitted[box] = fit_image(source[0], box, recipe.fit)
+        return fitted[box]
+
+    for box in recipe.sizes:
+        for fmt in recipe.formats:
+            params = ('derive', box, recipe.fit, fmt, recipe.profile)
+            output.render_image(output_path(path, box, fmt, out_dir), [path], params,
+                                lambda: render(box), profile=recipe.profile)
+
+    if worker:
+        return path, output.records, scheduler.cache_stats(output)
+    return path, [], None
+
+def find_images(patterns, out_dir):
+    """Lazily yield files matching the globs, skipping our own outputs"""
+    out_dir = os.path.abspath(out_dir) + os.sep
+    seen = set()
+    for pattern in patterns:
+        for path in glob.iglob(pattern, recursive=True):
+            if not os.path.isfile(path) or os.path.abspath(path).startswith(out_dir) or path in seen:
+                continue
+            seen.add(path)
+            yield path
+
+def derive_parallel(paths, recipe, out_dir, workers):
+    """
+    Yield derive_file results in input order, keeping at most
+    QUEUE_PER_WORKER files per worker in flight
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(derive_file, path, recipe, out_dir))
+            if len(pending) >= workers * QUEUE_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def derive(patterns, recipe, out_dir=DEFAULT_OUT, workers=None, output=None):
+    """Derive every matching file; returns the number of source files"""
+    workers = workers or os.cpu_count()
+    own_output = output is None
+    if own_output:
+        output = AssetOutput(asset_manifest.manifest_for(out_dir))
+
+    paths = find_images(patterns, out_dir)
+    if workers > 1:
+        results = derive_parallel(paths, recipe, out_dir, workers)
+    else:
+        results = (derive_file(path, recipe, out_dir, output) for path in paths)
+
+    count = 0
+    for path, records, stats in results:
+        for record in records:
+            output.write(*record)
+        scheduler.merge_cache_stats(output, stats)
+        count += 1
+        print(f"  {path} -> {len(recipe.sizes) * len(recipe.formats)} variants")
+
+    if own_output:
+        output.close()
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive resized variants of images matching a glob")
+    parser.add_argument('patterns', nargs='+', help="source globs, e.g. 'media/*.png' or 'art/**/*.jpg'")
+    parser.add_argument('--recipe', help=f"named recipe ({', '.join(RECIPES)}) or a JSON file")
+    parser.add_argument('--sizes', help="comma-separated sizes: N for an NxN box, or WxH")
+    parser.add_argument('--fit', choices=FIT_MODES, help="how images fill the box (default: contain)")
+    parser.add_argument('--formats', help="comma-separated output formats (default: png)")
+    parser.add_argument('--profile', choices=list(build_cache.ENCODE_PROFILES),
+                        help=f"compression profile (default: {build_cache.DEFAULT_PROFILE})")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="output directory, mirroring the source paths")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="parallel worker processes (1: in-process)")
+    args = parser.parse_args()
+
+    settings = load_recipe(args.recipe) if args.recipe else {}
+    if args.sizes:
+        settings['sizes'] = args.sizes.split(',')
+    if args.formats:
+        settings['formats'] = args.formats.split(',')
+    if args.fit:
+        settings['fit'] = args.fit
+    if args.profile:
+        settings['profile'] = args.profile
+    if 'sizes' not in settings:
+        parser.error("give --sizes or a --recipe")
+
+    try:
+        recipe = make_recipe(settings['sizes'], settings.get('fit', 'contain'), settings.get('formats', ['png']),
+                             settings.get('profile', build_cache.DEFAULT_PROFILE))
+    except ValueError as e:
+        parser.error(str(e))
+
+    sizes = ', '.join(f"{w}x{h}" for w, h in recipe.sizes)
+    print(f"Deriving {sizes} ({recipe.fit}) as {', '.join(recipe.formats)} with the {recipe.profile} profile")
+    if not derive(args.patterns, recipe, args.out, args.jobs):
+        parser.exit(1, f"No files match {' '.join(args.patterns)}\n")
+
+if __name__ == "__main__":
+    main()
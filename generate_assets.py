@@ -7,20 +7,20 @@ from PIL import Image, ImageDraw, ImageFont
 import os
 import base64
 from io import BytesIO
+import numpy as np
 
-# Paths
-LOGO_PATH = "logo/logo.png"
-BANNERS_PNG_DIR = "banners/png"
-BANNERS_SVG_DIR = "banners/svg"
-ICONS_PNG_DIR = "icons/png"
-ICONS_SVG_DIR = "icons/svg"
+import batch_composite
+import svg_render
+import svg_banners
+import glyph_outlines
+import logo_layout
+import masters
+import asset_jobs
+from asset_output import AssetOutput
+from asset_jobs import (LOGO_PATH, LOGO_SVG_PATH, LOGO_MASTER_PATH, BLACK, WHITE, GREEN, GOLD, TRANSPARENT,
+                        ICON_VARIANTS, TRANSPARENT_ICON_VARIANTS, BATCHED_KINDS)
 
-# Colors
-BLACK = (0, 0, 0, 255)
-WHITE = (255, 255, 255, 255)
-GREEN = (2, 255, 207, 255)  # #02FFCF
-GOLD = (212, 175, 55, 255)  # Golden color from logo
-TRANSPARENT = (0, 0, 0, 0)
+FONT_PATH = "/System/Library/Fonts/Helvetica.ttc"
 
 def create_banner_with_text(logo_img, bg_color, logo_color, text_color, width=1500, height=500):
     """Create a banner with logo and TOS text"""
@@ -29,19 +29,17 @@ def create_banner_with_text(logo_img, bg_color, logo_color, text_color, width=15
 
     # Resize logo to fit banner
     logo_height = int(height * 0.6)
-    logo = logo_img.copy()
-    logo.thumbnail((logo_height, logo_height), Image.Resampling.LANCZOS)
+    logo = prepare_logo(logo_img, logo_height, logo_color)
 
     # Paste logo on the left
-    logo_x = int(height * 0.2)
-    logo_y = (height - logo.size[1]) // 2
+    logo_x, logo_y = place_logo(logo_img, logo, (int(height * 0.2), 0, logo.width, height))
     banner.paste(logo, (logo_x, logo_y), logo)
 
     # Add TOS text
     draw = ImageDraw.Draw(banner)
     try:
         # Try to use a nice font
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", int(height * 0.4))
+        font = ImageFont.truetype(FONT_PATH, int(height * 0.4))
     except:
         # Fallback to default font
         font = ImageFont.load_default()
@@ -66,18 +64,10 @@ def create_icon_circle(logo_img, bg_color, logo_color, size=1000):
     if bg_color != TRANSPARENT:
         draw.ellipse([0, 0, size-1, size-1], fill=bg_color)
 
-    # Resize and paste logo
-    logo = logo_img.copy()
-    logo_size = int(size * 0.6)
-    logo.thumbnail((logo_size, logo_size), Image.Resampling.LANCZOS)
+    # Resize, recolor and paste logo
+    logo = prepare_logo(logo_img, int(size * 0.6), logo_color)
 
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
-
-    logo_x = (size - logo.size[0]) // 2
-    logo_y = (size - logo.size[1]) // 2
-    icon.paste(logo, (logo_x, logo_y), logo)
+    icon.paste(logo, place_logo(logo_img, logo, (0, 0, size, size)), logo)
 
     return icon
 
@@ -85,30 +75,81 @@ def create_icon_square(logo_img, bg_color, logo_color, size=1000):
     """Create square icon"""
     icon = Image.new('RGBA', (size, size), bg_color)
 
-    # Resize and paste logo
-    logo = logo_img.copy()
-    logo_size = int(size * 0.6)
-    logo.thumbnail((logo_size, logo_size), Image.Resampling.LANCZOS)
-
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
+    # Resize, recolor and paste logo
+    logo = prepare_logo(logo_img, int(size * 0.6), logo_color)
 
-    logo_x = (size - logo.size[0]) // 2
-    logo_y = (size - logo.size[1]) // 2
-    icon.paste(logo, (logo_x, logo_y), logo)
+    icon.paste(logo, place_logo(logo_img, logo, (0, 0, size, size)), logo)
 
     return icon
 
 def create_icon_transparent(logo_img, logo_color, size=1000):
     """Create transparent icon with just the logo"""
-    logo = logo_img.copy()
-    logo.thumbnail((size, size), Image.Resampling.LANCZOS)
-
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
-
+    return prepare_logo(logo_img, size, logo_color)
+
+def load_logo():
+    """
+    Use the design master when it can be rasterized, else the vector logo
+    when a renderer is installed, else the PNG export
+    """
+    if masters.can_rasterize(LOGO_MASTER_PATH):
+        return masters.Master(LOGO_MASTER_PATH)
+    if svg_render.renderer_available():
+        return svg_render.load_display_list(LOGO_SVG_PATH)
+    return Image.open(LOGO_PATH).convert('RGBA')
+
+def logo_sources(logo_img):
+    """Source files the renders depend on, for build cache keys"""
+    if isinstance(logo_img, masters.Master):
+        sources = [logo_img.path]
+    elif isinstance(logo_img, svg_render.DisplayList):
+        sources = [LOGO_SVG_PATH]
+    else:
+        sources = [LOGO_PATH]
+    if os.path.exists(FONT_PATH):
+        sources.append(FONT_PATH)
+    return sources
+
+def logo_content(logo_img):
+    """
+    Layout of the logo's visible content (logo_layout.Layout), measured once
+    per source file, or per pixel content for bitmap logos
+    """
+    if isinstance(logo_img, masters.Master):
+        return logo_layout.source_layout(logo_img.path, lambda: masters.render_master(
+            logo_img.path, logo_layout.ANALYSIS_SIZE))
+    if isinstance(logo_img, svg_render.DisplayList):
+        return logo_layout.source_layout(LOGO_SVG_PATH, lambda: svg_render.render_display_list(
+            logo_img, logo_layout.ANALYSIS_SIZE))
+    return logo_layout.image_layout(logo_img)
+
+def place_logo(logo_img, logo, box):
+    """Top-left corner that centers the prepared logo optically in box (x, y, width, height)"""
+    dx, dy = logo_layout.optical_offset(logo_content(logo_img), logo.size)
+    return box[0] + (box[2] - logo.width) // 2 + dx, box[1] + (box[3] - logo.height) // 2 + dy
+
+def prepare_logo(logo_img, max_size, logo_color):
+    """
+    Fit the logo's visible content, without the canvas margins, into a
+    max_size box in the requested color. Vector logos are rendered directly
+    from the content viewBox with the color applied as the fill; design
+    masters are rasterized so the content is max_size, cropped and recolored;
+    bitmap logos are cropped, downscaled and recolored.
+    """
+    layout = logo_content(logo_img)
+    color = None if logo_color == GOLD else logo_color
+    if isinstance(logo_img, svg_render.DisplayList):
+        content = logo_img._replace(view_box=logo_layout.trim_view_box(logo_img.view_box, layout))
+        return svg_render.render_display_list(content, max_size, color)
+
+    if isinstance(logo_img, masters.Master):
+        size = logo_layout.canvas_size(layout, max_size)
+        logo = masters.render_master(logo_img.path, size).crop(logo_layout.content_box(layout, size))
+    else:
+        logo = logo_img.crop(logo_layout.content_box(layout, max(logo_img.size)))
+    if max(logo.size) != max_size:
+        logo.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    if color is not None:
+        logo = colorize_logo(logo, color)
     return logo
 
 def colorize_logo(logo, color):
@@ -135,64 +176,36 @@ def image_to_base64(img):
     img_str = base64.b64encode(buffered.getvalue()).decode()
     return f"data:image/png;base64,{img_str}"
 
-def create_svg_banner(logo_img, bg_color, logo_color, text_color, width=1500, height=500):
-    """Create SVG banner with logo"""
+def create_svg_banner(logo_img, bg_color, logo_color, text_color, width=1500, height=500, font=None):
+    """Create SVG banner with logo; with a glyph_outlines.Font the text is drawn as outlines"""
     # Prepare logo
-    logo = logo_img.copy()
-    logo_height = int(height * 0.6)
-    logo.thumbnail((logo_height, logo_height), Image.Resampling.LANCZOS)
-
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
+    logo = prepare_logo(logo_img, int(height * 0.6), logo_color)
 
     # Convert logo to base64
     logo_base64 = image_to_base64(logo)
 
     # Calculate positions
-    logo_x = int(height * 0.2)
-    logo_y = (height - logo.height) // 2
-
-    # Background color
-    if bg_color == TRANSPARENT:
-        bg_fill = "none"
-        svg_bg = ""
-    else:
-        bg_fill = f"rgba({bg_color[0]},{bg_color[1]},{bg_color[2]},{bg_color[3]/255})"
-        svg_bg = f'<rect width="{width}" height="{height}" fill="{bg_fill}"/>'
-
-    # Text color
-    text_fill = f"rgba({text_color[0]},{text_color[1]},{text_color[2]},{text_color[3]/255})"
+    logo_x, logo_y = place_logo(logo_img, logo, (int(height * 0.2), 0, logo.width, height))
 
     # Text position
     text_x = logo_x + logo.width + int(height * 0.15)
     text_y = height // 2
 
-    svg = f'''<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">
-{svg_bg}
-<image x="{logo_x}" y="{logo_y}" width="{logo.width}" height="{logo.height}" href="{logo_base64}"/>
-<text x="{text_x}" y="{text_y}" font-family="Arial, sans-serif" font-size="{int(height * 0.35)}" font-weight="bold" fill="{text_fill}" dominant-baseline="middle">TOS</text>
-</svg>'''
-
-    return svg
+    background = None if bg_color == TRANSPARENT else svg_banners.rgba_fill(bg_color)
+    return svg_banners.render_assets_banner(
+        width, height, background, (logo_x, logo_y, logo.width, logo.height), logo_base64,
+        (text_x, text_y), int(height * 0.35), svg_banners.rgba_fill(text_color), font=font)
 
 def create_svg_icon_circle(logo_img, bg_color, logo_color, size=1000):
     """Create SVG circular icon"""
     # Prepare logo
-    logo = logo_img.copy()
-    logo_size = int(size * 0.6)
-    logo.thumbnail((logo_size, logo_size), Image.Resampling.LANCZOS)
-
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
+    logo = prepare_logo(logo_img, int(size * 0.6), logo_color)
 
     # Convert logo to base64
     logo_base64 = image_to_base64(logo)
 
     # Calculate positions
-    logo_x = (size - logo.width) // 2
-    logo_y = (size - logo.height) // 2
+    logo_x, logo_y = place_logo(logo_img, logo, (0, 0, size, size))
 
     # Background
     if bg_color == TRANSPARENT:
@@ -210,20 +223,13 @@ def create_svg_icon_circle(logo_img, bg_color, logo_color, size=1000):
 def create_svg_icon_square(logo_img, bg_color, logo_color, size=1000):
     """Create SVG square icon"""
     # Prepare logo
-    logo = logo_img.copy()
-    logo_size = int(size * 0.6)
-    logo.thumbnail((logo_size, logo_size), Image.Resampling.LANCZOS)
-
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
+    logo = prepare_logo(logo_img, int(size * 0.6), logo_color)
 
     # Convert logo to base64
     logo_base64 = image_to_base64(logo)
 
     # Calculate positions
-    logo_x = (size - logo.width) // 2
-    logo_y = (size - logo.height) // 2
+    logo_x, logo_y = place_logo(logo_img, logo, (0, 0, size, size))
 
     # Background
     bg_fill = f"rgba({bg_color[0]},{bg_color[1]},{bg_color[2]},{bg_color[3]/255})"
@@ -238,19 +244,13 @@ def create_svg_icon_square(logo_img, bg_color, logo_color, size=1000):
 def create_svg_icon_transparent(logo_img, logo_color, size=1000):
     """Create SVG transparent icon"""
     # Prepare logo
-    logo = logo_img.copy()
-    logo.thumbnail((size, size), Image.Resampling.LANCZOS)
-
-    # Change logo color if needed
-    if logo_color != GOLD:
-        logo = colorize_logo(logo, logo_color)
+    logo = prepare_logo(logo_img, size, logo_color)
 
     # Convert logo to base64
     logo_base64 = image_to_base64(logo)
 
     # Center the logo
-    logo_x = (size - logo.width) // 2
-    logo_y = (size - logo.height) // 2
+    logo_x, logo_y = place_logo(logo_img, logo, (0, 0, size, size))
 
     svg = f'''<svg width="{size}" height="{size}" viewBox="0 0 {size} {size}" xmlns="http://www.w3.org/2000/svg">
 <image x="{logo_x}" y="{logo_y}" width="{logo.width}" height="{logo.height}" href="{logo_base64}"/>
@@ -258,141 +258,91 @@ def create_svg_icon_transparent(logo_img, logo_color, size=1000):
 
     return svg
 
+def render_icon_variants(logo_img, kind, variants, size=1000):
+    """
+    All color variants of one raster icon kind in a single pass: variants
+    are job args, (bg, logo color) or (logo color,) for transparent icons.
+    The logo is fitted once and recolored and composited for every variant
+    in one array operation. Returns an N x H x W x 4 stack whose slices are
+    identical to the single renders.
+    """
+    if isinstance(logo_img, svg_render.DisplayList):
+        # Vector logos are rasterized in their fill color, so each variant is its own render
+        return np.stack([np.asarray(RENDERERS[kind](logo_img, *args, size=size)) for args in variants])
+
+    max_size = size if kind == 'icon_transparent' else int(size * 0.6)
+    logo = prepare_logo(logo_img, max_size, GOLD).convert('RGBA')
+    colors = [None if args[-1] == GOLD else args[-1] for args in variants]
+    if kind == 'icon_transparent':
+        return batch_composite.colorize_stack(np.asarray(logo), colors)
+    mask = batch_composite.shape_mask(kind.split('_')[1], size)
+    return batch_composite.composite_stack([args[0] for args in variants], mask, np.asarray(logo), colors, size,
+                                           place_logo(logo_img, logo, (0, 0, size, size)))
+
+# Renderers by job kind (see asset_jobs); job args follow the logo argument
+RENDERERS = {
+    'banner': create_banner_with_text,
+    'icon_circle': create_icon_circle,
+    'icon_square': create_icon_square,
+    'icon_transparent': create_icon_transparent,
+}
+
+SVG_RENDERERS = {
+    'svg_banner': create_svg_banner,
+    'svg_icon_circle': create_svg_icon_circle,
+    'svg_icon_square': create_svg_icon_square,
+    'svg_icon_transparent': create_svg_icon_transparent,
+}
+
+def render_jobs(output, jobs):
+    """Render planned banner and icon jobs into output"""
+    logo = load_logo()
+    sources = logo_sources(logo)
+    if isinstance(logo, masters.Master) and len(jobs) > 1:
+        layout = logo_content(logo)
+        masters.prefetch([(logo.path, logo_layout.canvas_size(layout, size)) for size in
+                          (asset_jobs.BANNER_LOGO, asset_jobs.ICON_LOGO, asset_jobs.ICON_SIZE[0])])
+
+    # Banner text is outlined with this font, so the font is a source of those renders
+    font = glyph_outlines.banner_font()
+
+    # The first cache miss of a batched kind renders it and the kind's later
+    # misses at once; each slice is dropped as soon as its job is written
+    batched = {}
+
+    def render_batched(job):
+        if job.path not in batched:
+            group = [j for j in jobs if j.kind == job.kind]
+            rest = [job] + [j for j in group[group.index(job) + 1:]
+                            if not output.is_cached(j.path, sources, (j.kind,) + tuple(j.args))]
+            stack = render_icon_variants(logo, job.kind, [j.args for j in rest], job.size[0])
+            batched.update((j.path, stack[i]) for i, j in enumerate(rest))
+        return Image.fromarray(batched.pop(job.path), 'RGBA')
+
+    for job in jobs:
+        params = (job.kind,) + tuple(job.args)
+        if job.kind == 'svg_banner' and font:
+            output.render_svg(job.path, sources + [font.path], params + ('outline', font.index),
+                              lambda: create_svg_banner(logo, *job.args, font=font), size=job.size)
+        elif job.kind in SVG_RENDERERS:
+            output.render_svg(job.path, sources, params,
+                              lambda: SVG_RENDERERS[job.kind](logo, *job.args), size=job.size)
+        elif job.kind in BATCHED_KINDS:
+            output.render_image(job.path, sources, params, lambda: render_batched(job))
+        else:
+            output.render_image(job.path, sources, params, lambda: RENDERERS[job.kind](logo, *job.args))
+        print(f"  Created {job.path}")
+
 def main():
-    # Load logo
-    logo = Image.open(LOGO_PATH).convert('RGBA')
+    output = AssetOutput()
 
     print("Generating banners...")
+    render_jobs(output, asset_jobs.plan_banners())
 
-    # Generate PNG banners
-    os.makedirs(BANNERS_PNG_DIR, exist_ok=True)
-
-    banners = [
-        ("black_background_white_logo.png", BLACK, GOLD, WHITE),
-        ("white_background_black_logo.png", WHITE, GOLD, BLACK),
-        ("green_background_black_logo.png", GREEN, GOLD, BLACK),
-        ("gradient_green_background_white_logo.png", GREEN, GOLD, WHITE),
-        ("transparent_backgroud_black_logo.png", TRANSPARENT, GOLD, BLACK),
-        ("transparent_background_white_logo.png", TRANSPARENT, GOLD, WHITE),
-        ("transparent_background_green_logo.png", TRANSPARENT, GOLD, GREEN),
-    ]
-
-    for filename, bg, logo_c, text_c in banners:
-        banner = create_banner_with_text(logo, bg, logo_c, text_c)
-        banner.save(os.path.join(BANNERS_PNG_DIR, filename))
-        print(f"  Created {filename}")
-
-    print("\nGenerating circle icons...")
-
-    # Generate circle icons
-    circle_dir = os.path.join(ICONS_PNG_DIR, "circle")
-    os.makedirs(circle_dir, exist_ok=True)
-
-    circle_icons = [
-        ("black_background_green_logo.png", BLACK, GREEN),
-        ("black_background_white_logo.png", BLACK, WHITE),
-        ("green_background_black_logo.png", GREEN, BLACK),
-        ("green_background_white_logo.png", GREEN, WHITE),
-        ("white_background_black_logo.png", WHITE, BLACK),
-        ("white_background_green_logo.png", WHITE, GREEN),
-    ]
-
-    for filename, bg, logo_c in circle_icons:
-        icon = create_icon_circle(logo, bg, logo_c)
-        icon.save(os.path.join(circle_dir, filename))
-        print(f"  Created {filename}")
-
-    print("\nGenerating square icons...")
-
-    # Generate square icons
-    square_dir = os.path.join(ICONS_PNG_DIR, "square")
-    os.makedirs(square_dir, exist_ok=True)
-
-    for filename, bg, logo_c in circle_icons:  # Same variants as circle
-        icon = create_icon_square(logo, bg, logo_c)
-        icon.save(os.path.join(square_dir, filename))
-        print(f"  Created {filename}")
-
-    print("\nGenerating transparent icons...")
-
-    # Generate transparent icons
-    transparent_dir = os.path.join(ICONS_PNG_DIR, "transparent")
-    os.makedirs(transparent_dir, exist_ok=True)
-
-    transparent_icons = [
-        ("black.png", BLACK),
-        ("white.png", WHITE),
-        ("green.png", GREEN),
-    ]
-
-    for filename, logo_c in transparent_icons:
-        icon = create_icon_transparent(logo, logo_c)
-        icon.save(os.path.join(transparent_dir, filename))
-        print(f"  Created {filename}")
-
-    print("\nDone! PNG files generated.")
-
-    # Generate SVG banners
-    print("\nGenerating SVG banners...")
-    os.makedirs(BANNERS_SVG_DIR, exist_ok=True)
-
-    svg_banners = [
-        ("black_background_white_logo.svg", BLACK, GOLD, WHITE),
-        ("white_background_black_logo.svg", WHITE, GOLD, BLACK),
-        ("green_background_black_logo.svg", GREEN, GOLD, BLACK),
-        ("gradient_green_background_white_logo.svg", GREEN, GOLD, WHITE),
-        ("transparent_background_black_logo.svg", TRANSPARENT, GOLD, BLACK),
-        ("transparent_background_white_logo.svg", TRANSPARENT, GOLD, WHITE),
-        ("transparent_background_green_logo.svg", TRANSPARENT, GOLD, GREEN),
-    ]
-
-    for filename, bg, logo_c, text_c in svg_banners:
-        svg_content = create_svg_banner(logo, bg, logo_c, text_c)
-        with open(os.path.join(BANNERS_SVG_DIR, filename), 'w') as f:
-            f.write(svg_content)
-        print(f"  Created {filename}")
-
-    # Generate SVG circle icons
-    print("\nGenerating SVG circle icons...")
-    circle_svg_dir = os.path.join(ICONS_SVG_DIR, "circle")
-    os.makedirs(circle_svg_dir, exist_ok=True)
-
-    for filename, bg, logo_c in circle_icons:
-        svg_filename = filename.replace('.png', '.svg')
-        svg_content = create_svg_icon_circle(logo, bg, logo_c)
-        with open(os.path.join(circle_svg_dir, svg_filename), 'w') as f:
-            f.write(svg_content)
-        print(f"  Created {svg_filename}")
-
-    # Generate SVG square icons
-    print("\nGenerating SVG square icons...")
-    square_svg_dir = os.path.join(ICONS_SVG_DIR, "square")
-    os.makedirs(square_svg_dir, exist_ok=True)
-
-    for filename, bg, logo_c in circle_icons:
-        svg_filename = filename.replace('.png', '.svg')
-        svg_content = create_svg_icon_square(logo, bg, logo_c)
-        with open(os.path.join(square_svg_dir, svg_filename), 'w') as f:
-            f.write(svg_content)
-        print(f"  Created {svg_filename}")
-
-    # Generate SVG transparent icons
-    print("\nGenerating SVG transparent icons...")
-    transparent_svg_dir = os.path.join(ICONS_SVG_DIR, "transparent")
-    os.makedirs(transparent_svg_dir, exist_ok=True)
-
-    svg_transparent_icons = [
-        ("black.svg", BLACK),
-        ("white.svg", WHITE),
-        ("green.svg", GREEN),
-    ]
-
-    for filename, logo_c in svg_transparent_icons:
-        svg_content = create_svg_icon_transparent(logo, logo_c)
-        with open(os.path.join(transparent_svg_dir, filename), 'w') as f:
-            f.write(svg_content)
-        print(f"  Created {filename}")
+    print("\nGenerating icons...")
+    render_jobs(output, asset_jobs.plan_icons())
 
+    output.close()
     print("\nAll done! PNG and SVG files generated successfully.")
 
 if __name__ == "__main__":
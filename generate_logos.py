@@ -5,20 +5,15 @@ Generate different sizes of logo files from TOS.png
 
 from PIL import Image
 import subprocess
+import functools
 import os
 
-# Source files
-SOURCE_LOGO = "logo/TOS.png"
-SOURCE_LOGO_TRANSPARENT = "logo/TOS_transparent.png"
-
-# Output directory
-OUTPUT_DIR = "logo"
-
-# Sizes to generate for logo files
-LOGO_SIZES = [16, 32, 48, 64, 128, 256, 512, 1024]
-
-# Sizes to generate for logo-transparent files
-TRANSPARENT_SIZES = [16, 32, 48, 64, 128, 150, 200, 256, 400, 512, 800]
+import svg_render
+import masters
+import derive
+import asset_jobs
+from asset_output import AssetOutput
+from asset_jobs import SOURCE_LOGO, SOURCE_LOGO_TRANSPARENT, SOURCE_SVG_TRANSPARENT, SOURCE_MASTER_TRANSPARENT
 
 def remove_background_with_rembg(image_path):
     """
@@ -58,58 +53,60 @@ def resize_image(image, size, resample=Image.Resampling.LANCZOS):
     """
     Resize image to target size while maintaining aspect ratio and quality
     """
-    # Create a copy to avoid modifying original
-    img = image.copy()
-
-    # For high quality resizing, use LANCZOS
-    img.thumbnail((size, size), resample)
-
-    return img
+    return derive.fit_image(image, (size, size), 'contain', resample)
+
+@functools.lru_cache(maxsize=None)
+def load_source(path):
+    """Decode a source image once, and only when a render needs it"""
+    return Image.open(path).convert('RGBA')
+
+def render_jobs(output, jobs):
+    """Render planned logo jobs into output"""
+    # Render transparent sizes straight from the design master (or else the
+    # SVG export) at the exact size when a rasterizer is installed. The full
+    # size is rendered from the same artwork at the PNG's pixel size, so the
+    # whole family keeps one framing.
+    use_master = masters.can_rasterize(SOURCE_MASTER_TRANSPARENT)
+    use_vector = svg_render.renderer_available()
+    if use_master:
+        masters.prefetch([(SOURCE_MASTER_TRANSPARENT, job.size[0]) for job in jobs
+                          if job.kind == 'logo-transparent'])
+
+    for job in jobs:
+        size = job.args[0]
+        source = SOURCE_LOGO if job.kind == 'logo' else SOURCE_LOGO_TRANSPARENT
+        if job.kind == 'logo-transparent' and (use_master or use_vector):
+            size = job.size[0]
+        if size == 'full':
+            sources, render = [source], lambda: load_source(source)
+        elif job.kind == 'logo-transparent' and use_master:
+            sources, render = [SOURCE_MASTER_TRANSPARENT], lambda: masters.render_master(SOURCE_MASTER_TRANSPARENT, size)
+        elif job.kind == 'logo-transparent' and use_vector:
+            sources, render = [SOURCE_SVG_TRANSPARENT], lambda: svg_render.render_logo(SOURCE_SVG_TRANSPARENT, size)
+        else:
+            sources, render = [source], lambda: resize_image(load_source(source), size)
+
+        width, height = output.render_image(job.path, sources, (job.kind, size), render)
+        print(f"  Created: {os.path.basename(job.path)} ({width}x{height})")
 
 def main():
     # Load source image
     print(f"Loading source image: {SOURCE_LOGO}")
-    source_img = Image.open(SOURCE_LOGO).convert('RGBA')
-    print(f"Source size: {source_img.size}")
-
-    # Ensure output directory exists
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    print(f"Source size: {Image.open(SOURCE_LOGO).size}")
 
-    # Generate logo files (with background)
-    print("\nGenerating logo files...")
-    for size in LOGO_SIZES:
-        resized = resize_image(source_img, size)
-        output_path = os.path.join(OUTPUT_DIR, f"logo-{size}x{size}.png")
-        resized.save(output_path, "PNG", optimize=True, quality=95)
-        print(f"  Created: logo-{size}x{size}.png ({resized.size[0]}x{resized.size[1]})")
-
-    # Save full size logo.png
-    logo_full = source_img.copy()
-    logo_full.save(os.path.join(OUTPUT_DIR, "logo.png"), "PNG", optimize=True, quality=95)
-    print(f"  Created: logo.png ({logo_full.size[0]}x{logo_full.size[1]})")
-
-    # Generate logo-transparent files
-    print("\nGenerating transparent logo files...")
-
-    # Check if transparent source exists
     if not os.path.exists(SOURCE_LOGO_TRANSPARENT):
-        print(f"Error: {SOURCE_LOGO_TRANSPARENT} not found")
-        return
-
-    # Load transparent source
-    transparent_source = Image.open(SOURCE_LOGO_TRANSPARENT).convert('RGBA')
-    print(f"Loaded transparent source: {transparent_source.size}")
+        print(f"Error: {SOURCE_LOGO_TRANSPARENT} not found, skipping transparent logo files")
+    elif masters.can_rasterize(SOURCE_MASTER_TRANSPARENT):
+        print(f"Rendering transparent sizes from design master: {SOURCE_MASTER_TRANSPARENT}")
+    elif svg_render.renderer_available():
+        print(f"Rendering transparent sizes from vector source: {SOURCE_SVG_TRANSPARENT}")
 
-    for size in TRANSPARENT_SIZES:
-        resized = resize_image(transparent_source, size)
-        output_path = os.path.join(OUTPUT_DIR, f"logo-transparent-{size}x{size}.png")
-        resized.save(output_path, "PNG", optimize=True, quality=95)
-        print(f"  Created: logo-transparent-{size}x{size}.png ({resized.size[0]}x{resized.size[1]})")
+    output = AssetOutput()
 
-    # Save full size logo-transparent.png
-    transparent_source.save(os.path.join(OUTPUT_DIR, "logo-transparent.png"), "PNG", optimize=True, quality=95)
-    print(f"  Created: logo-transparent.png ({transparent_source.size[0]}x{transparent_source.size[1]})")
+    print("\nGenerating logo files...")
+    render_jobs(output, asset_jobs.plan_logos())
 
+    output.close()
     print("\n✓ All logo files generated successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Banner text as glyph outlines: text is converted once per (text, font, size)
+into SVG path data, so banners need no font lookup on the client and look
+the same on every platform
+"""
+
+from collections import namedtuple
+import argparse
+import functools
+import json
+import os
+
+import build_cache
+
+# Environment variable with the banner font, "path" or "path#index" for collections
+FONT_ENV = "TOS_BANNER_FONT"
+
+# Bold sans faces tried in order, as (path, index in a .ttc collection)
+BANNER_FONTS = [
+    ('/System/Library/Fonts/Helvetica.ttc', 1),
+    ('/Library/Fonts/Arial Bold.ttf', 0),
+    ('C:/Windows/Fonts/arialbd.ttf', 0),
+    ('/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf', 0),
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 0),
+]
+
+# A font face inside a font file
+Font = namedtuple('Font', ['path', 'index'])
+
+# Path data in font units (y up) and the metrics needed to place it, in pixels
+Outline = namedtuple('Outline', ['d', 'scale', 'width', 'x_height', 'cap_height'])
+
+@functools.lru_cache(maxsize=None)
+def fonttools_available():
+    try:
+        import fontTools
+        return True
+    except ImportError:
+        print("Note: banner text stays live <text>. For glyph outlines run: pip install fonttools")
+        return False
+
+def parse_font(spec):
+    """'font.ttc#1' -> Font('font.ttc', 1)"""
+    path, _, index = spec.partition('#')
+    return Font(path, int(index or 0))
+
+@functools.lru_cache(maxsize=None)
+def banner_font():
+    """Font for banner outlines, or None when fontTools or a font is missing"""
+    if not fonttools_available():
+        return None
+    if os.environ.get(FONT_ENV):
+        return parse_font(os.environ[FONT_ENV])
+    for path, index in BANNER_FONTS:
+        if os.path.exists(path):
+            return Font(path, index)
+    return None
+
+@functools.lru_cache(maxsize=8)
+def load_font(font):
+    from fontTools.ttLib import TTFont
+    return TTFont(font.path, fontNumber=font.index, lazy=True)
+
+def kerning(tt):
+    """Pair kerning from a legacy 'kern' table; GPOS kerning is not applied"""
+    if 'kern' not in tt:
+        return {}
+    pairs = {}
+    for table in tt['kern'].kernTables:
+        pairs.update(getattr(table, 'kernTable', {}))
+    return pairs
+
+def trace(text, font):
+    """Path data for text set on one baseline from x=0, and its advance width, in font units"""
+    from fontTools.pens.svgPathPen import SVGPathPen
+    from fontTools.pens.transformPen import TransformPen
+
+    tt = load_font(font)
+    glyphs = tt.getGlyphSet()
+    cmap = tt.getBestCmap()
+    advances = tt['hmtx'].metrics
+    pairs = kerning(tt)
+
+    pen = SVGPathPen(glyphs, ntos=lambda v: f'{v:.2f}'.rstrip('0').rstrip('.'))
+    x = 0
+    previous = None
+    for char in text:
+        name = cmap.get(ord(char), '.notdef')
+        x += pairs.get((previous, name), 0)
+        glyphs[name].draw(TransformPen(pen, (1, 0, 0, 1, x, 0)))
+        x += advances[name][0]
+        previous = name
+    return pen.getCommands(), x
+
+def glyph_top(tt, char):
+    """Top of a glyph's outline in font units, for fonts without OS/2 heights"""
+    from fontTools.pens.boundsPen import BoundsPen
+
+    glyphs = tt.getGlyphSet()
+    pen = BoundsPen(glyphs)
+    glyphs[tt.getBestCmap().get(ord(char), '.notdef')].draw(pen)
+    return pen.bounds[3] if pen.bounds else 0
+
+def compute_outline(text, font, size):
+    tt = load_font(font)
+    scale = size / tt['head'].unitsPerEm
+    os2 = tt['OS/2'] if 'OS/2' in tt else None
+    x_height = getattr(os2, 'sxHeight', 0) or glyph_top(tt, 'x')
+    cap_height = getattr(os2, 'sCapHeight', 0) or glyph_top(tt, 'H')
+    d, width = trace(text, font)
+    return Outline(d, scale, width * scale, x_height * scale, cap_height * scale)
+
+@functools.lru_cache(maxsize=None)
+def outline(text, font, size):
+    """
+    Outline of text at a font size in pixels. Computed once per process, and
+    kept in the shared build cache when one is configured.
+    """
+    cache = build_cache.open_cache()
+    if cache is None:
+        return compute_outline(text, font, size)
+
+    key = build_cache.cache_key([font.path], ('outline', font.index, text, size))
+    cached = cache.get(key)
+    if cached is not None:
+        data, meta = cached
+        return Outline(data.decode('ascii'), *meta['metrics'])
+    result = compute_outline(text, font, size)
+    cache.put(key, result.d.encode('ascii'), {'metrics': list(result[1:])})
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the glyph outline used for banner text")
+    parser.add_argument('text', nargs='?', default="TOS Network")
+    parser.add_argument('--size', type=int, default=90, help="font size in pixels")
+    parser.add_argument('--font', help=f"font file, 'path#index' for collections (default: ${FONT_ENV} or a system bold sans)")
+    args = parser.parse_args()
+
+    font = parse_font(args.font) if args.font else banner_font()
+    if font is None or not fonttools_available():
+        parser.exit(1, "No banner font found. Set --font or $TOS_BANNER_FONT (and pip install fonttools)\n")
+    result = outline(args.text, font, args.size)
+    print(json.dumps({'font': f'{font.path}#{font.index}', 'width': round(result.width, 2),
+                      'path_bytes': len(result.d), 'd': result.d[:120] + '...'}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Layout of a logo's visible content, precomputed per source file: alpha
+bounding box, optical center and aspect, cached by source hash, so icons
+and banners size and place the content instead of the canvas and its margins
+"""
+
+from collections import namedtuple
+import argparse
+import functools
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+import build_cache
+
+# Bump when the measurement changes
+LAYOUT_VERSION = 1
+
+# Pixels with alpha at or below this count as margin
+ALPHA_THRESHOLD = 8
+
+# Long side of the raster measured for vector sources and masters
+ANALYSIS_SIZE = 1024
+
+# How far content moves from its box center toward its alpha centroid (0: box center, 1: centroid)
+OPTICAL_WEIGHT = 0.5
+
+# bbox: (left, top, right, bottom) in units of the canvas long side
+# center: optical center as fractions of the bbox; aspect: bbox width / height
+Layout = namedtuple('Layout', ['bbox', 'center', 'aspect'])
+
+def measure(img):
+    """Layout of an RGBA image's visible content"""
+    alpha = np.asarray(img.convert('RGBA'))[..., 3].astype(np.float64)
+    long_side = max(img.size)
+    rows = np.nonzero((alpha > ALPHA_THRESHOLD).any(axis=1))[0]
+    cols = np.nonzero((alpha > ALPHA_THRESHOLD).any(axis=0))[0]
+    if not len(rows):
+        return Layout((0.0, 0.0, img.width / long_side, img.height / long_side), (0.5, 0.5),
+                      img.width / img.height)
+
+    left, right = int(cols[0]), int(cols[-1]) + 1
+    top, bottom = int(rows[0]), int(rows[-1]) + 1
+    content = alpha[top:bottom, left:right]
+    total = content.sum()
+    cx = (content.sum(axis=0) * (np.arange(right - left) + 0.5)).sum() / total / (right - left)
+    cy = (content.sum(axis=1) * (np.arange(bottom - top) + 0.5)).sum() / total / (bottom - top)
+    return Layout((left / long_side, top / long_side, right / long_side, bottom / long_side),
+                  (float(cx), float(cy)), float((right - left) / (bottom - top)))
+
+@functools.lru_cache(maxsize=None)
+def open_cache():
+    """The shared build cache if configured, else the local layout cache"""
+    return build_cache.local_cache('layouts')
+
+def layout_key(path):
+    return build_cache.cache_key([path], ('layout', LAYOUT_VERSION, ALPHA_THRESHOLD, ANALYSIS_SIZE))
+
+def image_digest(img):
+    """Hash of an image's mode, size and pixels"""
+    digest = hashlib.sha256(f'{img.mode} {img.width}x{img.height}'.encode('ascii'))
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+def image_key(img):
+    return build_cache.cache_key([], ('layout', LAYOUT_VERSION, ALPHA_THRESHOLD, image_digest(img)))
+
+# Layouts measured in this process, by cache key
+_layouts = {}
+
+def cached_layout(key, render):
+    if key in _layouts:
+        return _layouts[key]
+
+    cache = open_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        bbox, center, aspect = json.loads(cached[0])
+        layout = Layout(tuple(bbox), tuple(center), aspect)
+    else:
+        layout = measure(render())
+        cache.put(key, json.dumps(layout).encode('utf-8'), {'size': None})
+    _layouts[key] = layout
+    return layout
+
+def source_layout(path, render):
+    """
+    Layout of the source file at path. render() returns the image to
+    measure and is only called when the layout is not cached yet.
+    """
+    return cached_layout(layout_key(path), render)
+
+def image_layout(img):
+    """Layout of an in-memory image, keyed by its own pixels"""
+    return cached_layout(image_key(img), lambda: img)
+
+def content_box(layout, canvas_size):
+    """
+    Content bbox in pixels for a canvas whose long side is canvas_size: the
+    content size rounded to whole pixels, centered on the content, so a
+    canvas from canvas_size(layout, max_size) crops to exactly max_size
+    """
+    left, top, right, bottom = layout.bbox
+    spans = []
+    for start, end in ((left, right), (top, bottom)):
+        length = round((end - start) * canvas_size)
+        offset = round((start + end) / 2 * canvas_size - length / 2)
+        offset = max(0, min(offset, math.ceil(end * canvas_size) - length))
+        spans.append((offset, offset + length))
+    (x0, x1), (y0, y1) = spans
+    return x0, y0, x1, y1
+
+def canvas_size(layout, max_size):
+    """Canvas long side at which the content's long side rounds to max_size"""
+    left, top, right, bottom = layout.bbox
+    return round(max_size / max(right - left, bottom - top))
+
+def trim_view_box(view_box, layout):
+    """SVG viewBox (x, y, width, height) narrowed to the content"""
+    x, y, width, height = view_box
+    long_side = max(width, height)
+    left, top, right, bottom = layout.bbox
+    return (x + left * long_side, y + top * long_side, (right - left) * long_side, (bottom - top) * long_side)
+
+def optical_offset(layout, size):
+    """Shift (dx, dy) for content of this pixel size, from box-centered toward optically centered"""
+    cx, cy = layout.center
+    return round(OPTICAL_WEIGHT * (0.5 - cx) * size[0]), round(OPTICAL_WEIGHT * (0.5 - cy) * size[1])
+
+def main():
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description="Print the content layout of logo images")
+    parser.add_argument('images', nargs='+', help="PNG files")
+    args = parser.parse_args()
+
+    for path in args.images:
+        layout = source_layout(path, lambda: Image.open(path))
+        bbox = ', '.join(f'{v:.3f}' for v in layout.bbox)
+        print(f"{path}: bbox ({bbox}), optical center ({layout.center[0]:.3f}, {layout.center[1]:.3f}), "
+              f"aspect {layout.aspect:.3f}")
+
+if __name__ == "__main__":
+    main()
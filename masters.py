@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Rasterize the .ai / .eps design masters at exact sizes, cached by master hash
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import namedtuple
+from io import BytesIO
+from PIL import Image
+import argparse
+import functools
+import os
+import shutil
+import subprocess
+
+import build_cache
+from asset_writer import write_atomic
+
+# Masters exported to PNG by default
+DEFAULT_MASTERS = ["logo_ai/tos1024.ai", "tos/logo1024x1024.ai", "tos/logo_1571295526.eps"]
+DEFAULT_SIZES = [16, 32, 64, 128, 256, 512, 1024]
+
+GHOSTSCRIPT_NAMES = ['gs', 'gswin64c', 'gswin32c']
+
+# Illustrator files are PDF-compatible; EPS needs Ghostscript
+PDF_EXTENSIONS = ('.ai', '.pdf')
+EPS_EXTENSIONS = ('.eps', '.ps')
+
+# A design master used as a render source
+Master = namedtuple('Master', ['path'])
+
+@functools.lru_cache(maxsize=None)
+def ghostscript():
+    """Ghostscript executable and version, or None"""
+    for name in GHOSTSCRIPT_NAMES:
+        path = shutil.which(name)
+        if path:
+            version = subprocess.run([path, '--version'], capture_output=True, text=True).stdout.strip()
+            return path, version
+    return None
+
+@functools.lru_cache(maxsize=None)
+def pdf_backend():
+    """First available PDF rasterizer as (name, version), or None"""
+    try:
+        import pypdfium2
+        return 'pdfium', build_cache.package_version('pypdfium2')
+    except ImportError:
+        pass
+    try:
+        import fitz
+        return 'mupdf', getattr(fitz, 'VersionBind', '')
+    except ImportError:
+        pass
+    gs = ghostscript()
+    return ('ghostscript', gs[1]) if gs else None
+
+def backend_for(path):
+    """Rasterizer for a master file, or None when none is installed"""
+    if path.lower().endswith(PDF_EXTENSIONS):
+        return pdf_backend()
+    if path.lower().endswith(EPS_EXTENSIONS):
+        gs = ghostscript()
+        return ('ghostscript', gs[1]) if gs else None
+    return None
+
+def can_rasterize(path):
+    return os.path.exists(path) and backend_for(path) is not None
+
+def rasterize_pdfium(path, size):
+    import pypdfium2
+    page = pypdfium2.PdfDocument(path)[0]
+    scale = size / max(page.get_size())
+    return page.render(scale=scale, fill_color=(0, 0, 0, 0), may_draw_forms=True).to_pil()
+
+def rasterize_mupdf(path, size):
+    import fitz
+    page = fitz.open(path)[0]
+    scale = size / max(page.rect.width, page.rect.height)
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=True)
+    return Image.frombytes('RGBA', (pix.width, pix.height), pix.samples)
+
+def rasterize_ghostscript(path, size):
+    fit = '-dEPSFitPage' if path.lower().endswith(EPS_EXTENSIONS) else '-dPDFFitPage'
+    result = subprocess.run(
+        [ghostscript()[0], '-q', '-dSAFER', '-dBATCH', '-dNOPAUSE', '-sDEVICE=pngalpha',
+         '-dTextAlphaBits=4', '-dGraphicsAlphaBits=4', f'-g{size}x{size}', '-dFIXEDMEDIA', fit,
+         '-sOutputFile=-', path],
+        capture_output=True, check=True)
+    return Image.open(BytesIO(result.stdout))
+
+RASTERIZERS = {
+    'pdfium': rasterize_pdfium,
+    'mupdf': rasterize_mupdf,
+    'ghostscript': rasterize_ghostscript,
+}
+
+def rasterize(path, size):
+    """Render a master so its long side is exactly size pixels, transparency kept"""
+    backend = backend_for(path)
+    if backend is None:
+        raise RuntimeError(f"No rasterizer for {path}. Please run: pip install pypdfium2 (or install Ghostscript)")
+    return RASTERIZERS[backend[0]](path, size).convert('RGBA')
+
+@functools.lru_cache(maxsize=None)
+def open_cache():
+    """The shared build cache if configured, else the local master cache"""
+    return build_cache.local_cache('masters')
+
+def master_key(path, size):
+    return build_cache.cache_key([path], ('master', size, backend_for(path)))
+
+def render_to_cache(path, size):
+    """Rasterize a master and store the PNG; returns the PNG bytes"""
+    data = build_cache.encode_png(rasterize(path, size))
+    open_cache().put(master_key(path, size), data, {'size': [size, size]})
+    return data
+
+def master_png(path, size):
+    """PNG bytes of a master at size pixels, rendered only on a cache miss"""
+    cached = open_cache().get(master_key(path, size))
+    return cached[0] if cached is not None else render_to_cache(path, size)
+
+@functools.lru_cache(maxsize=32)
+def load_master(path, size):
+    return Image.open(BytesIO(master_png(path, size))).convert('RGBA')
+
+def render_master(path, size):
+    """A master at size pixels, from the cache when it was rendered before"""
+    return load_master(path, size).copy()
+
+def prefetch(requests, jobs=None):
+    """Rasterize the uncached (path, size) requests in parallel"""
+    cache = open_cache()
+    missing = sorted({(p, s) for p, s in requests if not cache.contains(master_key(p, s))})
+    if len(missing) < 2:
+        return
+    print(f"Rasterizing {len(missing)} master sizes in parallel...")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(render_to_cache, *zip(*missing)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Export design masters to PNG at exact sizes")
+    parser.add_argument('masters', nargs='*', default=DEFAULT_MASTERS,
+                        help="master files (default: %(default)s)")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="long side in pixels")
+    parser.add_argument('--out', default='masters', help="output directory")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="parallel worker processes")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    masters = [m for m in args.masters if can_rasterize(m)]
+    for m in sorted(set(args.masters) - set(masters)):
+        print(f"Skipping {m}: no rasterizer installed (pip install pypdfium2, or Ghostscript for EPS)")
+
+    prefetch([(m, s) for m in masters for s in sizes], args.jobs)
+
+    os.makedirs(args.out, exist_ok=True)
+    for m in masters:
+        stem = os.path.splitext(os.path.basename(m))[0]
+        for size in sizes:
+            write_atomic(os.path.join(args.out, f"{stem}-{size}.png"), master_png(m, size))
+        print(f"  {m} -> {len(sizes)} sizes ({backend_for(m)[0]})")
+    print(open_cache().report())
+
+if __name__ == "__main__":
+    main()
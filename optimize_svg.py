@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Optimize SVG sources and generated SVGs: strip editor metadata, drop unused
+definitions, collapse redundant groups and round coordinates
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import xml.etree.ElementTree as ET
+import argparse
+import gzip
+import os
+import re
+
+import asset_jobs
+from asset_writer import write_atomic
+
+# Default directories to optimize
+DEFAULT_DIRS = asset_jobs.SVG_DIRS
+
+# Digits kept after the decimal point
+DEFAULT_PRECISION = 2
+
+# Digits kept in transform matrices, where coefficients scale whole shapes
+TRANSFORM_PRECISION = 6
+
+# Digits kept for values between 0 and 1 (gradient stops, opacities), where
+# the coordinate precision would move color across the whole shape
+UNIT_PRECISION = 4
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+# Attributes holding numbers that can be rounded
+NUMERIC_ATTRS = {
+    'd', 'points', 'transform', 'gradientTransform', 'viewBox', 'x', 'y',
+    'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry', 'x1', 'y1', 'x2', 'y2',
+    'fx', 'fy', 'offset', 'stroke-width', 'opacity', 'fill-opacity',
+    'stroke-opacity', 'stop-opacity',
+}
+
+# Attributes where a leading zero can be dropped (".5" instead of "0.5")
+PATH_DATA_ATTRS = {'d', 'points'}
+
+# Attributes rounded at TRANSFORM_PRECISION
+TRANSFORM_ATTRS = {'transform', 'gradientTransform'}
+
+# Attributes rounded at UNIT_PRECISION
+UNIT_ATTRS = {'offset', 'opacity', 'fill-opacity', 'stroke-opacity', 'stop-opacity'}
+
+# Elements whose text content is meaningful
+TEXT_TAGS = {'text', 'tspan', 'style', 'title', 'textPath'}
+
+# Editor-only elements and namespaces
+METADATA_TAGS = {'metadata', 'title', 'desc'}
+EDITOR_NAMESPACES = (
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://ns.adobe.com/",
+    "http://www.bohemiancoding.com/sketch/ns",
+)
+
+# Root attributes written by Illustrator that have no effect on rendering
+REDUNDANT_ROOT_ATTRS = {'version', 'x', 'y', f'{{{XML_NS}}}space'}
+
+# Elements a group transform can be moved onto
+TRANSFORMABLE_TAGS = {'g', 'path', 'circle', 'ellipse', 'rect', 'polygon',
+                      'polyline', 'line', 'image', 'text', 'use'}
+
+DEFINITION_TAGS = {'linearGradient', 'radialGradient', 'pattern', 'clipPath',
+                   'mask', 'filter', 'symbol', 'marker'}
+
+NUMBER_RE = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATH_COMMAND_RE = re.compile(r'[MmZzLlHhVvCcSsQqTtAa]')
+PATH_SEPARATOR_RE = re.compile(r'[\s,]*')
+
+# Arc arguments are rx ry rotation large-arc sweep x y; the two flags are
+# single characters that may be written without separators ("a10 10 0 0110 10")
+ARC_ARGS = 7
+ARC_FLAGS = (3, 4)
+REFERENCE_RE = re.compile(r'#([A-Za-z_][\w\-.:]*)')
+
+def local_name(tag):
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1]
+
+def namespace(name):
+    """Return the XML namespace of a tag or attribute name"""
+    return name[1:].split('}', 1)[0] if name.startswith('{') else ''
+
+def format_number(value, precision, drop_leading_zero=False):
+    """Format a number with at most `precision` decimals and no trailing zeros"""
+    text = f'{round(float(value), precision):.{precision}f}'
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        text = '0'
+    if drop_leading_zero:
+        if text.startswith('0.'):
+            text = text[1:]
+        elif text.startswith('-0.'):
+            text = '-' + text[2:]
+    return text
+
+def needs_separator(previous, number):
+    """Whether two formatted numbers written back to back would merge, e.g. "10" + ".5" """
+    if number.startswith('-'):
+        return False
+    return not (number.startswith('.') and ('.' in previous or 'e' in previous.lower()))
+
+def round_numbers(text, precision, drop_leading_zero=False):
+    """
+    Round every number in an attribute value. Compact path data leaves out
+    separators ("M10.001.5"), so a space is inserted where neighbouring
+    numbers would otherwise run together after rounding.
+    """
+    parts = []
+    end = 0
+    previous = None
+    for match in NUMBER_RE.finditer(text):
+        number = format_number(match.group(0), precision, drop_leading_zero)
+        if match.start() == end and previous is not None and needs_separator(previous, number):
+            parts.append(' ')
+        parts.append(text[end:match.start()])
+        parts.append(number)
+        end = match.end()
+        previous = number
+    parts.append(text[end:])
+    return ''.join(parts)
+
+def path_tokens(d):
+    """
+    Yield (start, end, kind, text) for the commands, numbers and arc flags
+    of path data. Raises ValueError on malformed data.
+    """
+    pos = 0
+    command = None
+    index = 0
+    while True:
+        pos = PATH_SEPARATOR_RE.match(d, pos).end()
+        if pos == len(d):
+            return
+        match = PATH_COMMAND_RE.match(d, pos)
+        if match:
+            command, index = match.group(0), 0
+            yield pos, match.end(), 'command', command
+            pos = match.end()
+            continue
+
+        if command in ('a', 'A') and index % ARC_ARGS in ARC_FLAGS:
+            if d[pos] not in '01':
+                raise ValueError(f"Bad arc flag at {pos}: {d[pos:pos + 10]!r}")
+            yield pos, pos + 1, 'flag', d[pos]
+            pos += 1
+        else:
+            match = NUMBER_RE.match(d, pos)
+            if not match:
+                raise ValueError(f"Bad path data at {pos}: {d[pos:pos + 10]!r}")
+            yield pos, match.end(), 'number', match.group(0)
+            pos = match.end()
+        index += 1
+
+def round_path(d, precision):
+    """
+    Round the numbers of path data, keeping arc flags as single characters.
+    Malformed data is returned unchanged.
+    """
+    try:
+        tokens = list(path_tokens(d))
+    except ValueError:
+        return d
+
+    parts = []
+    end = 0
+    previous = None
+    for start, stop, kind, token in tokens:
+        adjacent = start == end and previous is not None
+        if kind == 'number':
+            token = format_number(token, precision, True)
+            if adjacent and needs_separator(previous, token):
+                parts.append(' ')
+        elif kind == 'flag' and adjacent:
+            # A flag right after a number would be read as its next digit
+            parts.append(' ')
+        parts.append(d[end:start])
+        parts.append(token)
+        end = stop
+        previous = token if kind == 'number' else None
+    parts.append(d[end:])
+    return ''.join(parts)
+
+def is_editor_name(name):
+    """Check whether a tag or attribute belongs to a design tool namespace"""
+    return namespace(name).startswith(EDITOR_NAMESPACES)
+
+def collect_references(root):
+    """Find every id referenced through url(#id), href="#id" or CSS"""
+    refs = set()
+    for elem in root.iter():
+        for value in elem.attrib.values():
+            refs.update(REFERENCE_RE.findall(value))
+        if local_name(elem.tag) == 'style' and elem.text:
+            refs.update(REFERENCE_RE.findall(elem.text))
+    return refs
+
+def strip_metadata(elem):
+    """Remove comments, editor elements and editor attributes in place"""
+    for child in list(elem):
+        if not isinstance(child.tag, str) or is_editor_name(child.tag) \
+                or local_name(child.tag) in METADATA_TAGS:
+            elem.remove(child)
+            continue
+        strip_metadata(child)
+
+    for name in list(elem.attrib):
+        if is_editor_name(name):
+            del elem.attrib[name]
+
+def clean_root(root):
+    """Drop Illustrator root attributes that do not affect rendering"""
+    for name in REDUNDANT_ROOT_ATTRS:
+        root.attrib.pop(name, None)
+
+    style = root.get('style')
+    if style:
+        decls = [d for d in style.split(';') if d.strip() and not d.strip().startswith('enable-background')]
+        if decls:
+            root.set('style', ';'.join(d.strip() for d in decls))
+        else:
+            del root.attrib['style']
+
+def remove_unused_definitions(root):
+    """Remove gradients and other definitions nobody references"""
+    while True:
+        refs = collect_references(root)
+        removed = False
+        for parent in root.iter():
+            for child in list(parent):
+                if local_name(child.tag) in DEFINITION_TAGS and child.get('id') not in refs:
+                    parent.remove(child)
+                    removed = True
+        if not removed:
+            return
+
+def remove_unused_ids(root, refs):
+    """Drop ids that are only editor layer names"""
+    for elem in root.iter():
+        if elem.get('id') is not None and elem.get('id') not in refs:
+            del elem.attrib['id']
+
+def collapse_groups(elem):
+    """
+    Hoist the children of attribute-less groups, push a lone transform down
+    to a single child and drop empty groups and defs.
+    """
+    for child in list(elem):
+        collapse_groups(child)
+        tag = local_name(child.tag)
+
+        if tag in ('g', 'defs') and len(child) == 0:
+            elem.remove(child)
+            continue
+
+        if tag == 'g' and set(child.attrib) == {'transform'} and len(child) == 1 \
+                and local_name(child[0].tag) in TRANSFORMABLE_TAGS:
+            grandchild = child[0]
+            transforms = [child.get('transform'), grandchild.get('transform')]
+            grandchild.set('transform', ' '.join(t for t in transforms if t))
+            del child.attrib['transform']
+
+        if tag == 'g' and not child.attrib:
+            position = list(elem).index(child)
+            elem.remove(child)
+            for offset, grandchild in enumerate(child):
+                elem.insert(position + offset, grandchild)
+
+def round_attributes(root, precision, transform_precision=TRANSFORM_PRECISION):
+    """
+    Round numeric attributes to the configured precision; transforms and
+    values between 0 and 1 keep more digits
+    """
+    for elem in root.iter():
+        for name, value in elem.attrib.items():
+            if name not in NUMERIC_ATTRS or value.endswith('%'):
+                continue
+            if name == 'd':
+                elem.set(name, round_path(value, precision))
+            elif name in TRANSFORM_ATTRS:
+                elem.set(name, round_numbers(value, transform_precision))
+            elif name in UNIT_ATTRS:
+                elem.set(name, round_numbers(value, max(precision, UNIT_PRECISION)))
+            else:
+                elem.set(name, round_numbers(value, precision, name in PATH_DATA_ATTRS))
+
+def strip_whitespace(root):
+    """Drop indentation text and minify stylesheets"""
+    for elem in root.iter():
+        tag = local_name(elem.tag)
+        if tag == 'style' and elem.text:
+            elem.text = re.sub(r'\s+', ' ', elem.text).strip()
+        elif tag not in TEXT_TAGS and elem.text and not elem.text.strip():
+            elem.text = None
+        if elem.tail and not elem.tail.strip():
+            elem.tail = None
+
+def optimize_svg_text(svg_text, precision=DEFAULT_PRECISION, transform_precision=TRANSFORM_PRECISION):
+    """Optimize SVG markup and return the optimized markup"""
+    root = ET.fromstring(svg_text)
+    strip_metadata(root)
+    clean_root(root)
+    remove_unused_definitions(root)
+    remove_unused_ids(root, collect_references(root))
+    collapse_groups(root)
+    round_attributes(root, precision, transform_precision)
+    strip_whitespace(root)
+    return ET.tostring(root, encoding='unicode')
+
+def write_compressed(path, data, formats):
+    """Write precompressed siblings (path.gz, path.br) next to an SVG"""
+    written = {}
+    if 'gzip' in formats:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        with open(path + '.gz', 'wb') as f:
+            f.write(compressed)
+        written['gzip'] = len(compressed)
+
+    if 'brotli' in formats:
+        try:
+            import brotli
+        except ImportError:
+            print("Error: brotli module not found. Please run: pip install brotli")
+        else:
+            compressed = brotli.compress(data, quality=11)
+            with open(path + '.br', 'wb') as f:
+                f.write(compressed)
+            written['brotli'] = len(compressed)
+    return written
+
+def optimize_file(path, output_path, precision, compress, dry_run):
+    """Optimize one SVG file and return its size report row"""
+    with open(path, 'rb') as f:
+        original = f.read()
+
+    data = optimize_svg_text(original, precision).encode('utf-8')
+    report = {'path': path, 'before': len(original), 'after': len(data)}
+
+    if not dry_run:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        write_atomic(output_path, data)
+        report.update(write_compressed(output_path, data, compress))
+    return report
+
+def find_svgs(paths):
+    """Expand files and directories into a sorted list of SVG files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                files.extend(os.path.join(dirpath, n) for n in filenames if n.endswith('.svg'))
+        elif path.endswith('.svg'):
+            files.append(path)
+    return sorted(files)
+
+def optimize_files(files, outputs, precision=DEFAULT_PRECISION, compress=(), dry_run=False, jobs=None):
+    """Optimize files in parallel and return their size report rows"""
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(optimize_file, files, outputs,
+                             [precision] * len(files), [compress] * len(files),
+                             [dry_run] * len(files)))
+
+def render_jobs(output, jobs):
+    """Optimize planned SVG jobs (see asset_jobs) in place"""
+    files = [job.path for job in jobs]
+    print_report(optimize_files(files, files))
+
+def print_report(rows):
+    """Print per-file and total size savings"""
+    before = sum(r['before'] for r in rows)
+    after = sum(r['after'] for r in rows)
+    for r in rows:
+        saved = 100 * (1 - r['after'] / r['before']) if r['before'] else 0
+        extra = ''.join(f"  {k} {r[k]:>7}" for k in ('gzip', 'brotli') if k in r)
+        print(f"  {r['path']:<55} {r['before']:>8} -> {r['after']:>8}  (-{saved:4.1f}%){extra}")
+    if before:
+        print(f"\nTotal: {len(rows)} files, {before} -> {after} bytes (-{100 * (1 - after / before):.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize SVG files")
+    parser.add_argument('paths', nargs='*', default=DEFAULT_DIRS,
+                        help="SVG files or directories (default: %(default)s)")
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help="decimals kept for coordinates")
+    parser.add_argument('--out', help="write optimized files under this directory instead of in place")
+    parser.add_argument('--compress', default='', help="precompressed siblings to emit: gzip,brotli")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="parallel worker processes")
+    parser.add_argument('--dry-run', action='store_true', help="only print the size report")
+    args = parser.parse_args()
+
+    files = find_svgs(args.paths)
+    compress = {c.strip() for c in args.compress.split(',') if c.strip()}
+    outputs = [os.path.join(args.out, f) if args.out else f for f in files]
+
+    print(f"Optimizing {len(files)} SVG files...")
+    rows = optimize_files(files, outputs, args.precision, compress, args.dry_run, args.jobs)
+
+    print_report(rows)
+
+if __name__ == "__main__":
+    main()
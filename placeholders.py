@@ -0,0 +1,112 @@
+"""
+Low-quality image placeholders: BlurHash strings and tiny inline previews
+"""
+
+from PIL import Image
+from io import BytesIO
+import base64
+import numpy as np
+
+BASE83_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+# Images are shrunk to this many pixels on the long side before encoding
+ENCODE_SIZE = 32
+
+# Long side of the inline preview image
+PREVIEW_SIZE = 16
+
+# Background used to flatten transparent images for the BlurHash
+FLATTEN_COLOR = (255, 255, 255, 255)
+
+def base83(value, length):
+    """Encode an integer as a fixed-length base83 string"""
+    chars = []
+    for i in range(1, length + 1):
+        digit = (value // 83 ** (length - i)) % 83
+        chars.append(BASE83_CHARS[digit])
+    return ''.join(chars)
+
+def srgb_to_linear(values):
+    """Convert 0-255 sRGB values to linear light"""
+    v = values / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(value):
+    """Convert a linear light value back to a 0-255 sRGB integer"""
+    v = min(max(value, 0.0), 1.0)
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+def components_for(size):
+    """Pick BlurHash component counts that follow the image aspect ratio"""
+    width, height = size
+    ratio = width / height
+    x = max(1, min(9, round(4 * ratio ** 0.5)))
+    y = max(1, min(9, round(4 / ratio ** 0.5)))
+    return x, y
+
+def blurhash(img, x_components=None, y_components=None):
+    """
+    Encode an image as a BlurHash string. All DCT components are computed in
+    one NumPy pass over a small copy of the image.
+    """
+    if x_components is None or y_components is None:
+        x_components, y_components = components_for(img.size)
+
+    small = img.convert('RGBA')
+    small.thumbnail((ENCODE_SIZE, ENCODE_SIZE), Image.Resampling.BILINEAR)
+    if small.getextrema()[3][0] < 255:
+        flat = Image.new('RGBA', small.size, FLATTEN_COLOR)
+        flat.alpha_composite(small)
+        small = flat
+
+    pixels = srgb_to_linear(np.asarray(small.convert('RGB'), dtype=np.float64))
+    height, width = pixels.shape[:2]
+
+    basis_x = np.cos(np.pi * np.outer(np.arange(x_components), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(y_components), np.arange(height)) / height)
+
+    # factors[j, i] = mean over pixels of basis_y[j] * basis_x[i] * pixel
+    factors = np.einsum('jy,ix,yxc->jic', basis_y, basis_x, pixels) / (width * height)
+    factors[1:, :] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)
+
+    dc, ac = factors[0], factors[1:]
+
+    parts = [base83((x_components - 1) + (y_components - 1) * 9, 1)]
+
+    if len(ac):
+        actual_max = float(np.abs(ac).max())
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max = 0
+        max_value = 1
+    parts.append(base83(quantised_max, 1))
+
+    r, g, b = (linear_to_srgb(c) for c in dc)
+    parts.append(base83((r << 16) + (g << 8) + b, 4))
+
+    scaled = ac / max_value
+    quantised = np.clip(np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quantised:
+        parts.append(base83(qr * 19 * 19 + qg * 19 + qb, 2))
+
+    return ''.join(parts)
+
+def preview_data_uri(img, max_size=PREVIEW_SIZE):
+    """Tiny PNG preview as an inline data URI, transparency preserved"""
+    preview = img.convert('RGBA')
+    preview.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+    buffered = BytesIO()
+    preview.save(buffered, 'PNG', optimize=True)
+    return 'data:image/png;base64,' + base64.b64encode(buffered.getvalue()).decode()
+
+def placeholder(img):
+    """Placeholder record stored in the manifest for one image"""
+    return {
+        'blurhash': blurhash(img),
+        'preview': preview_data_uri(img),
+    }
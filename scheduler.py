@@ -0,0 +1,176 @@
+"""
+Memory-aware parallel rendering: jobs are admitted to worker processes
+largest-first, only while their estimated peak memory fits a budget
+"""
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import importlib
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import asset_jobs
+from asset_output import AssetOutput
+
+# Environment variable with the memory budget in MB
+MEMORY_BUDGET_ENV = "TOS_MEMORY_BUDGET"
+
+# Share of the container / machine memory used when no budget is given
+BUDGET_FRACTION = 0.75
+
+# cgroup v2 and v1 memory limits, as seen inside CI containers
+CGROUP_LIMITS = ['/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes']
+
+MB = 2**20
+
+# Decoded images kept by the generators as (module, lru_cache function). Workers
+# clear them after every unit, since the memory estimate only covers the unit
+# that runs next.
+IMAGE_CACHES = [('masters', 'load_master'), ('generate_logos', 'load_source')]
+
+def memory_limit():
+    """Memory available to this process: the container limit, else physical RAM"""
+    for path in CGROUP_LIMITS:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # "max" or a huge number means no limit
+        if value.isdigit() and int(value) < 2**60:
+            return int(value)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def default_budget():
+    """Memory budget from the environment, else a share of the memory limit"""
+    if os.environ.get(MEMORY_BUDGET_ENV):
+        return int(os.environ[MEMORY_BUDGET_ENV]) * MB
+    limit = memory_limit()
+    return int(limit * BUDGET_FRACTION) if limit else 4096 * MB
+
+def max_rss(who=None):
+    """Peak resident set size in bytes (ru_maxrss is KB on Linux, bytes on macOS)"""
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+class RecordingOutput(AssetOutput):
+    """
+    AssetOutput for worker processes: renders go through the build cache as
+    usual, but encoded outputs are handed back to the parent process to be
+    written, bundled and recorded there.
+    """
+
+    def __init__(self):
+        super().__init__(bundles=[], write_tree=False)
+        self.records = []
+
+    def write(self, path, data, size=None, group=None, placeholder=None):
+        self.records.append((path, data, size, group, placeholder))
+
+def cache_stats(output):
+    """Build cache counters of a worker's output, to be merged in the parent"""
+    cache = output.cache
+    return (cache.hits, cache.misses, cache.bytes_fetched) if cache is not None else None
+
+def merge_cache_stats(output, stats):
+    if stats is not None and output.cache is not None:
+        output.cache.hits += stats[0]
+        output.cache.misses += stats[1]
+        output.cache.bytes_fetched += stats[2]
+
+def release_image_caches():
+    """Drop decoded images cached by the unit that just finished"""
+    for module, name in IMAGE_CACHES:
+        if module in sys.modules:
+            getattr(sys.modules[module], name).cache_clear()
+
+def render_unit(unit):
+    """Worker side: render a unit of jobs (asset_jobs.batch_units) and return its outputs and statistics"""
+    output = RecordingOutput()
+    try:
+        importlib.import_module(unit[0].module).render_jobs(output, unit)
+    finally:
+        release_image_caches()
+    return output.records, cache_stats(output), os.getpid(), max_rss()
+
+class Scheduler:
+    """
+    Runs render jobs on a process pool, the jobs of a batched icon kind as
+    one unit. A unit is started only while the estimated peak memory of all
+    running units (asset_jobs.unit_peak_bytes) stays within the budget; the
+    largest unit that fits is always started first, and a unit larger than
+    the whole budget runs alone. Outputs are passed to
+    the AssetOutput in plan order, so manifests and bundles do not depend on
+    completion order.
+    """
+
+    def __init__(self, budget=None, workers=None):
+        self.budget = budget or default_budget()
+        self.workers = workers or os.cpu_count()
+
+    def run(self, jobs, output):
+        units = asset_jobs.batch_units(jobs)
+        order = {id(unit): i for i, unit in enumerate(units)}
+        pending = sorted(units, key=asset_jobs.unit_peak_bytes, reverse=True)
+        running = {}
+        finished = {}
+        next_index = 0
+        in_use = 0
+        peak_in_use = 0
+        max_concurrency = 0
+        busy_time = 0.0
+        worker_rss = {}
+
+        start = last = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                # Admit the largest units that fit, or one unit if nothing runs
+                while pending and len(running) < self.workers:
+                    fits = [unit for unit in pending if in_use + asset_jobs.unit_peak_bytes(unit) <= self.budget]
+                    if not fits and running:
+                        break
+                    unit = fits[0] if fits else pending[0]
+                    pending.remove(unit)
+                    running[pool.submit(render_unit, unit)] = unit
+                    in_use += asset_jobs.unit_peak_bytes(unit)
+                peak_in_use = max(peak_in_use, in_use)
+                max_concurrency = max(max_concurrency, len(running))
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                now = time.perf_counter()
+                busy_time += len(running) * (now - last)
+                last = now
+
+                for future in done:
+                    unit = running.pop(future)
+                    in_use -= asset_jobs.unit_peak_bytes(unit)
+                    records, stats, pid, rss = future.result()
+                    worker_rss[pid] = max(worker_rss.get(pid, 0), rss)
+                    merge_cache_stats(output, stats)
+                    finished[order[id(unit)]] = records
+
+                # Hand over outputs in plan order
+                while next_index in finished:
+                    for record in finished.pop(next_index):
+                        output.write(*record)
+                    next_index += 1
+
+        elapsed = time.perf_counter() - start
+        mean_concurrency = busy_time / elapsed if elapsed else 0
+        print(f"\nScheduler: {len(jobs)} jobs in {len(units)} units on {self.workers} workers, "
+              f"budget {self.budget // MB} MB")
+        print(f"  Concurrency: max {max_concurrency}, mean {mean_concurrency:.1f}")
+        print(f"  Estimated peak: {peak_in_use // MB} MB")
+        if worker_rss:
+            print(f"  Peak RSS: main {max_rss() // MB} MB, largest worker {max(worker_rss.values()) // MB} MB, "
+                  f"all workers at most {sum(worker_rss.values()) // MB} MB")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Pack the TOS icons into sprite atlases with CSS classes and a JSON frame map
+"""
+
+from PIL import Image
+import argparse
+import json
+import math
+import os
+
+import asset_manifest
+import generate_assets
+from asset_output import AssetOutput
+
+# Output directory
+SPRITE_DIR = "icons/sprites"
+
+# Defaults
+ATLAS_SIZES = [32, 64]
+DENSITIES = [1, 2, 3]
+FORMATS = ['png']
+PADDING = 2
+
+# Growth factor when the packer runs out of room
+BIN_GROWTH = 1.1
+
+MIME_TYPES = {'png': 'image/png', 'webp': 'image/webp'}
+
+def contains(outer, inner):
+    """Check whether rectangle inner lies inside rectangle outer"""
+    return (inner[0] >= outer[0] and inner[1] >= outer[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2]
+            and inner[1] + inner[3] <= outer[1] + outer[3])
+
+class MaxRectsPacker:
+    """
+    MaxRects bin packer with the best-short-side-fit heuristic. Free space is
+    kept as a list of maximal (x, y, w, h) rectangles.
+    """
+
+    def __init__(self, width, height):
+        self.free = [(0, 0, width, height)]
+
+    def insert(self, width, height):
+        """Place a rectangle and return its (x, y), or None if it does not fit"""
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if width <= fw and height <= fh:
+                score = (min(fw - width, fh - height), max(fw - width, fh - height), fy, fx)
+                if best is None or score < best[0]:
+                    best = (score, (fx, fy))
+        if best is None:
+            return None
+
+        x, y = best[1]
+        self._split(x, y, width, height)
+        return x, y
+
+    def _split(self, x, y, width, height):
+        free = []
+        for rect in self.free:
+            fx, fy, fw, fh = rect
+            if x >= fx + fw or x + width <= fx or y >= fy + fh or y + height <= fy:
+                free.append(rect)
+                continue
+            if x > fx:
+                free.append((fx, fy, x - fx, fh))
+            if x + width < fx + fw:
+                free.append((x + width, fy, fx + fw - x - width, fh))
+            if y > fy:
+                free.append((fx, fy, fw, y - fy))
+            if y + height < fy + fh:
+                free.append((fx, y + height, fw, fy + fh - y - height))
+
+        # Drop rectangles contained in another one (keeping one of equal pairs)
+        self.free = [r for i, r in enumerate(free)
+                     if not any(contains(o, r) and (o != r or j < i) for j, o in enumerate(free) if j != i)]
+
+def next_power_of_two(value):
+    return 1 << max(0, math.ceil(math.log2(value)))
+
+def pack(rects, padding=PADDING, power_of_two=False):
+    """
+    Pack named (width, height) rectangles. Returns (atlas width, atlas height,
+    {name: (x, y)}). Each rectangle gets `padding` pixels of space around it.
+    """
+    padded = {name: (w + padding, h + padding) for name, (w, h) in rects.items()}
+    order = sorted(padded, key=lambda n: (-max(padded[n]), -padded[n][0] * padded[n][1], n))
+
+    area = sum(w * h for w, h in padded.values())
+    side = max(max(max(wh) for wh in padded.values()), math.ceil(math.sqrt(area)))
+
+    while True:
+        bin_size = next_power_of_two(side + padding) if power_of_two else side + padding
+        packer = MaxRectsPacker(bin_size - padding, bin_size - padding)
+        positions = {}
+        for name in order:
+            pos = packer.insert(*padded[name])
+            if pos is None:
+                break
+            positions[name] = (pos[0] + padding, pos[1] + padding)
+        else:
+            break
+        side = max(side + 1, math.ceil(side * BIN_GROWTH))
+
+    width = max(x + rects[n][0] for n, (x, y) in positions.items()) + padding
+    height = max(y + rects[n][1] for n, (x, y) in positions.items()) + padding
+    if power_of_two:
+        width, height = next_power_of_two(width), next_power_of_two(height)
+    return width, height, positions
+
+def icon_renderers(logo):
+    """All icon variants as {name: render(size)}"""
+    renderers = {}
+    for filename, bg, logo_c in generate_assets.ICON_VARIANTS:
+        stem = os.path.splitext(filename)[0]
+        renderers[f'circle/{stem}'] = lambda size, bg=bg, c=logo_c: generate_assets.create_icon_circle(logo, bg, c, size)
+        renderers[f'square/{stem}'] = lambda size, bg=bg, c=logo_c: generate_assets.create_icon_square(logo, bg, c, size)
+    for filename, logo_c in generate_assets.TRANSPARENT_ICON_VARIANTS:
+        stem = os.path.splitext(filename)[0]
+        renderers[f'transparent/{stem}'] = lambda size, c=logo_c: generate_assets.create_icon_transparent(logo, c, size)
+    return renderers
+
+def render_atlas(renderers, positions, atlas_size, icon_size, scale):
+    """Render every icon at icon_size * scale into one atlas image"""
+    atlas = Image.new('RGBA', (atlas_size[0] * scale, atlas_size[1] * scale), (0, 0, 0, 0))
+    for name, (x, y) in positions.items():
+        icon = renderers[name](icon_size * scale)
+        # Icons smaller than their frame (e.g. a non-square logo) are centered
+        offset_x = (icon_size * scale - icon.size[0]) // 2
+        offset_y = (icon_size * scale - icon.size[1]) // 2
+        atlas.paste(icon, (x * scale + offset_x, y * scale + offset_y), icon)
+    return atlas
+
+def css_class(name):
+    return name.replace('/', '-').replace('_', '-')
+
+def atlas_name(base, scale, fmt):
+    return f'{base}@{scale}x.{fmt}' if scale != 1 else f'{base}.{fmt}'
+
+def atlas_css(base, icon_size, atlas_size, positions, densities, formats):
+    """CSS with one class per icon; image-set picks the density and format"""
+    prefix = f'tos-icon-{icon_size}'
+    # Modern formats first, PNG as the plain fallback
+    preferred = sorted(formats, key=lambda fmt: fmt == 'png')
+    fallback = 'png' if 'png' in formats else formats[0]
+    image_set = ', '.join(
+        f'url({atlas_name(base, scale, fmt)}) type("{MIME_TYPES[fmt]}") {scale}x'
+        for fmt in preferred for scale in densities)
+
+    lines = [
+        f'.{prefix} {{',
+        '  display: inline-block;',
+        f'  width: {icon_size}px;',
+        f'  height: {icon_size}px;',
+        f'  background-image: url({atlas_name(base, 1, fallback)});',
+        f'  background-image: image-set({image_set});',
+        f'  background-size: {atlas_size[0]}px {atlas_size[1]}px;',
+        '  background-repeat: no-repeat;',
+        '}',
+    ]
+    for name, (x, y) in sorted(positions.items()):
+        lines.append(f'.{prefix}.{css_class(name)} {{ background-position: -{x}px -{y}px; }}')
+    return '\n'.join(lines) + '\n'
+
+def atlas_json(base, icon_size, atlas_size, positions, densities, formats):
+    """Frame map for the wallet UI and other non-CSS consumers"""
+    return {
+        'size': list(atlas_size),
+        'icon_size': icon_size,
+        'images': {fmt: {f'{scale}x': atlas_name(base, scale, fmt) for scale in densities} for fmt in formats},
+        'frames': {
+            name: {'x': x, 'y': y, 'w': icon_size, 'h': icon_size, 'class': css_class(name)}
+            for name, (x, y) in sorted(positions.items())
+        },
+    }
+
+def build_atlases(output, logo, sources, sizes=ATLAS_SIZES, densities=DENSITIES, formats=FORMATS,
+                  padding=PADDING, power_of_two=False, out_dir=SPRITE_DIR):
+    """Write atlases, CSS and JSON for every requested icon size"""
+    renderers = icon_renderers(logo)
+
+    for icon_size in sizes:
+        base = f'icons-{icon_size}'
+        width, height, positions = pack({name: (icon_size, icon_size) for name in renderers},
+                                        padding, power_of_two)
+
+        for scale in densities:
+            # Rendered at most once per density, however many formats are encoded
+            rendered = []
+
+            def render():
+                if not rendered:
+                    rendered.append(render_atlas(renderers, positions, (width, height), icon_size, scale))
+                return rendered[0]
+
+            for fmt in formats:
+                path = os.path.join(out_dir, atlas_name(base, scale, fmt))
+                params = ('sprite_atlas', icon_size, scale, sorted(positions.items()), (width, height), fmt)
+                output.render_image(path, sources, params, render)
+                print(f"  Created {atlas_name(base, scale, fmt)} ({width * scale}x{height * scale})")
+
+        css = atlas_css(base, icon_size, (width, height), positions, densities, formats)
+        output.write(os.path.join(out_dir, f'{base}.css'), css.encode('utf-8'))
+
+        frames = atlas_json(base, icon_size, (width, height), positions, densities, formats)
+        output.write(os.path.join(out_dir, f'{base}.json'), (json.dumps(frames, indent=2) + '\n').encode('utf-8'))
+        print(f"  Created {base}.css and {base}.json ({len(positions)} icons)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build icon sprite atlases")
+    parser.add_argument('--sizes', default=','.join(map(str, ATLAS_SIZES)), help="icon sizes in CSS pixels")
+    parser.add_argument('--densities', default=','.join(map(str, DENSITIES)), help="pixel densities, e.g. 1,2,3")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="atlas formats: png,webp")
+    parser.add_argument('--padding', type=int, default=PADDING, help="pixels between icons")
+    parser.add_argument('--pot', action='store_true', help="round atlas dimensions up to powers of two")
+    parser.add_argument('--out', default=SPRITE_DIR, help="output directory")
+    args = parser.parse_args()
+
+    logo = generate_assets.load_logo()
+    output = AssetOutput(asset_manifest.manifest_for(args.out))
+
+    print("Generating sprite atlases...")
+    build_atlases(output, logo, generate_assets.logo_sources(logo),
+                  sizes=[int(s) for s in args.sizes.split(',')],
+                  densities=[int(d) for d in args.densities.split(',')],
+                  formats=args.formats.split(','),
+                  padding=args.padding, power_of_two=args.pot, out_dir=args.out)
+    output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Single SVG banner emitter: each layout is compiled once into a template and
+variants are produced by filling its slots
+"""
+
+import argparse
+import math
+import re
+import time
+
+import glyph_outlines
+
+# Banner layout shared by the banners/ scripts
+BANNER_SPACING = 40
+GRADIENT_ID = 'greenGradient'
+INVERT_MATRIX = '-1 0 0 0 1  0 -1 0 0 1  0 0 -1 0 1  0 0 0 1 0'
+
+def escape_attr(value):
+    """Escape an attribute value the way ElementTree does"""
+    value = str(value)
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if '\n' in value:
+        value = value.replace('\n', '&#10;')
+    return value
+
+def escape_text(value):
+    """Escape element text the way ElementTree does"""
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+ESCAPERS = {'attr': escape_attr, 'text': escape_text, 'raw': str}
+
+class SvgTemplate:
+    """
+    Markup with {{slot}} placeholders, compiled once into a str.format
+    template. {{slot|text}} escapes element text and {{slot|raw}} inserts a
+    pre-rendered fragment; plain slots are escaped as attribute values.
+    """
+
+    SLOT_RE = re.compile(r'\{\{(\w+)(?:\|(\w+))?\}\}')
+
+    def __init__(self, source):
+        parts = []
+        self.escapers = {}
+        pos = 0
+        for match in self.SLOT_RE.finditer(source):
+            parts.append(source[pos:match.start()].replace('{', '{{').replace('}', '}}'))
+            parts.append('{' + match.group(1) + '}')
+            self.escapers[match.group(1)] = ESCAPERS[match.group(2) or 'attr']
+            pos = match.end()
+        parts.append(source[pos:].replace('{', '{{').replace('}', '}}'))
+        self._format = ''.join(parts).format_map
+
+    def render(self, **values):
+        return self._format({name: escape(values[name]) for name, escape in self.escapers.items()})
+
+# Layout of generate_assets.py: 1500x500, "TOS", base64 PNG logo
+ASSETS_BANNER = SvgTemplate(
+    '<svg width="{{width}}" height="{{height}}" viewBox="0 0 {{width}} {{height}}" xmlns="http://www.w3.org/2000/svg">\n'
+    '{{background|raw}}\n'
+    '<image x="{{logo_x}}" y="{{logo_y}}" width="{{logo_width}}" height="{{logo_height}}" href="{{logo_href}}"/>\n'
+    '{{label|raw}}\n'
+    '</svg>'
+)
+ASSETS_TEXT = SvgTemplate(
+    '<text x="{{x}}" y="{{y}}" font-family="Arial, sans-serif" font-size="{{font_size}}" '
+    'font-weight="bold" fill="{{fill}}" dominant-baseline="middle">{{text|text}}</text>'
+)
+ASSETS_RECT = SvgTemplate('<rect width="{{width}}" height="{{height}}" fill="{{fill}}"/>')
+
+# Layout of the banners/ scripts: 950x370, "TOS Network", logo linked or embedded
+NETWORK_BANNER = SvgTemplate(
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+    'width="{{width}}" height="{{height}}" viewBox="0 0 {{width}} {{height}}">'
+    '{{defs|raw}}{{background|raw}}'
+    '<image x="{{logo_x}}" y="{{logo_y}}" width="{{logo_width}}" height="{{logo_height}}" '
+    'xlink:href="{{logo_href}}"{{logo_attrs|raw}} />'
+    '{{label|raw}}'
+    '</svg>'
+)
+NETWORK_TEXT = SvgTemplate(
+    '<text x="{{x}}" y="{{y}}" font-family="Helvetica, Arial, sans-serif" '
+    'font-size="{{font_size}}" font-weight="bold" fill="{{fill}}">{{text|text}}</text>'
+)
+NETWORK_RECT = SvgTemplate('<rect width="{{width}}" height="{{height}}" fill="{{fill}}" />')
+NETWORK_GRADIENT = (
+    f'<linearGradient id="{GRADIENT_ID}" x1="0%" y1="0%" x2="100%" y2="0%">'
+    '<stop offset="0%" style="stop-color:#003200;stop-opacity:1" />'
+    '<stop offset="100%" style="stop-color:#00C864;stop-opacity:1" />'
+    '</linearGradient>'
+)
+BRIGHTNESS_FILTER = SvgTemplate(
+    '<feComponentTransfer>'
+    '<feFuncR type="linear" slope="{{slope}}" />'
+    '<feFuncG type="linear" slope="{{slope}}" />'
+    '<feFuncB type="linear" slope="{{slope}}" />'
+    '</feComponentTransfer>'
+)
+INVERT_FILTER = f'<feColorMatrix type="matrix" values="{INVERT_MATRIX}" />'
+CSS_FILTER_ATTR = SvgTemplate(' style="filter: {{filter}}"')
+SVG_FILTER_ATTR = SvgTemplate(' filter="url(#{{filter_id}})"')
+
+# Text as glyph outlines: path data is in font units with y up, placed at the baseline
+TEXT_PATH = SvgTemplate(
+    '<path transform="translate({{x}} {{y}}) scale({{scale}} -{{scale}})" fill="{{fill}}" '
+    'aria-label="{{text}}" d="{{d}}"/>'
+)
+
+def rgba_fill(color):
+    """SVG fill for an RGBA tuple, as generate_assets writes it"""
+    return f"rgba({color[0]},{color[1]},{color[2]},{color[3]/255})"
+
+def number(value):
+    """Coordinate with at most two decimals and no trailing zeros"""
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+def outlined_text(text, font, font_size, x, baseline, fill, shape=None):
+    """Text as a single path of glyph outlines (glyph_outlines.Font), baseline at (x, baseline)"""
+    shape = shape or glyph_outlines.outline(text, font, font_size)
+    return TEXT_PATH.render(x=number(x), y=number(baseline), scale=f'{shape.scale:.6g}',
+                            fill=fill, text=text, d=shape.d)
+
+def fitted_outline(text, font, font_size, max_width):
+    """Outline of text at font_size, or shrunk to at most max_width wide; returns (outline, size)"""
+    shape = glyph_outlines.outline(text, font, font_size)
+    if shape.width <= max_width:
+        return shape, font_size
+    size = math.floor(font_size * max_width / shape.width * 100) / 100
+    return glyph_outlines.outline(text, font, size), size
+
+def render_assets_banner(width, height, background, logo_box, logo_href, text_pos, font_size,
+                         text_fill, text="TOS", font=None):
+    """
+    Banner in the generate_assets layout. background is an SVG fill or None
+    for a transparent banner; logo_box is (x, y, width, height). With a font
+    the text is emitted as glyph outlines, otherwise as live <text>.
+    """
+    rect = ASSETS_RECT.render(width=width, height=height, fill=background) if background else ''
+    if font:
+        # Capitals centered on text_pos, as in the PNG banner
+        shape = glyph_outlines.outline(text, font, font_size)
+        label = outlined_text(text, font, font_size, text_pos[0], text_pos[1] + shape.cap_height / 2,
+                              text_fill, shape)
+    else:
+        label = ASSETS_TEXT.render(x=text_pos[0], y=text_pos[1], font_size=font_size, fill=text_fill, text=text)
+    return ASSETS_BANNER.render(
+        width=width, height=height, background=rect,
+        logo_x=logo_box[0], logo_y=logo_box[1], logo_width=logo_box[2], logo_height=logo_box[3],
+        logo_href=logo_href, label=label)
+
+def render_network_banner(width, height, logo_size, padding, text, font_size, logo_href,
+                          background, text_fill, gradient=False, css_filter=None,
+                          svg_filter_id=None, brightness=1.0, invert=False, font=None):
+    """
+    Banner in the banners/ layout. The logo is recolored either with a CSS
+    filter (css_filter) or with an SVG filter built from brightness/invert.
+    With a font the text is emitted as glyph outlines, shrunk when a wide
+    font would run past the right padding.
+    """
+    defs = []
+    if gradient:
+        defs.append(NETWORK_GRADIENT)
+        background = f'url(#{GRADIENT_ID})'
+
+    logo_attrs = ''
+    if css_filter and css_filter != 'none':
+        logo_attrs = CSS_FILTER_ATTR.render(filter=css_filter)
+    elif svg_filter_id and (invert or brightness != 1.0):
+        effects = ''
+        if brightness != 1.0:
+            effects += BRIGHTNESS_FILTER.render(slope=brightness)
+        if invert:
+            effects += INVERT_FILTER
+        defs.append(f'<filter id="{escape_attr(svg_filter_id)}">{effects}</filter>')
+        logo_attrs = SVG_FILTER_ATTR.render(filter_id=svg_filter_id)
+
+    logo_x = padding
+    logo_y = (height - logo_size[1]) // 2
+    rect = NETWORK_RECT.render(width=width, height=height, fill=background) \
+        if background and background != 'none' else ''
+
+    text_x = logo_x + logo_size[0] + BANNER_SPACING
+    text_y = height // 2 + font_size // 3  # Adjust for visual centering
+    if font:
+        shape, size = fitted_outline(text, font, font_size, width - padding - text_x)
+        label = outlined_text(text, font, size, text_x, height // 2 + size // 3, text_fill, shape)
+    else:
+        label = NETWORK_TEXT.render(x=text_x, y=text_y, font_size=font_size, fill=text_fill, text=text)
+
+    return NETWORK_BANNER.render(
+        width=width, height=height,
+        defs=f'<defs>{"".join(defs)}</defs>' if defs else '<defs />',
+        background=rect,
+        logo_x=logo_x, logo_y=logo_y, logo_width=logo_size[0], logo_height=logo_size[1],
+        logo_href=logo_href, logo_attrs=logo_attrs, label=label)
+
+def benchmark(count):
+    """Render `count` variants of every layout and report the throughput"""
+    logo_href = 'data:image/png;base64,' + 'A' * 200000
+    colors = [f'#{i * 2654435761 % 0xFFFFFF:06X}' for i in range(count)]
+
+    layouts = {
+        'generate_assets (1500x500, base64)': lambda c: render_assets_banner(
+            1500, 500, c, (100, 100, 300, 300), logo_href, (475, 250), 175, c),
+        'banners v1 (linked logo, CSS filter)': lambda c: render_network_banner(
+            950, 370, (250, 250), 60, "TOS Network", 90, '../tos/logo512x512.svg', c, c,
+            css_filter='brightness(0) invert(1)'),
+        'banners v2 (base64 logo, SVG filter)': lambda c: render_network_banner(
+            950, 370, (250, 250), 60, "TOS Network", 90, logo_href, c, c,
+            svg_filter_id=f'logoFilter_{c[1:]}', brightness=2.0, invert=True),
+    }
+    font = glyph_outlines.banner_font()
+    if font:
+        layouts['banners v1 with glyph outlines'] = lambda c: render_network_banner(
+            950, 370, (250, 250), 60, "TOS Network", 90, '../tos/logo512x512.svg', c, c,
+            css_filter='brightness(0) invert(1)', font=font)
+
+    for name, render in layouts.items():
+        start = time.perf_counter()
+        for color in colors:
+            render(color)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<40} {count / elapsed:>10.0f} variants/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled SVG banner templates")
+    parser.add_argument('--count', type=int, default=10000, help="variants per layout")
+    args = parser.parse_args()
+
+    print(f"Rendering {args.count} variants per layout...")
+    benchmark(args.count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Render the vector TOS logo directly at the requested size and color
+"""
+
+from PIL import Image
+from collections import namedtuple
+from io import BytesIO
+import xml.etree.ElementTree as ET
+import functools
+import re
+import sys
+import time
+
+# Vector sources
+TOS_SVG = "tos/logo512x512.svg"
+GOLD_SVG = "logo_ai/tos1024.svg"
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+# Elements that end up in the display list
+SHAPE_TAGS = {'path', 'circle', 'ellipse', 'rect', 'polygon', 'polyline', 'line'}
+PAINT_SERVER_TAGS = {'linearGradient', 'radialGradient'}
+GEOMETRY_ATTRS = ['d', 'cx', 'cy', 'r', 'rx', 'ry', 'x', 'y', 'width', 'height',
+                  'points', 'x1', 'y1', 'x2', 'y2']
+
+ET.register_namespace('', SVG_NS)
+
+# A parsed vector logo: viewBox, serialized gradients and flattened shapes
+DisplayList = namedtuple('DisplayList', ['view_box', 'defs', 'shapes'])
+Shape = namedtuple('Shape', ['tag', 'geometry', 'fill', 'transform'])
+
+def local_name(tag):
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1]
+
+def parse_style_rules(root):
+    """Collect `.class{prop:value}` rules from <style> elements"""
+    rules = {}
+    for style in root.iter(f'{{{SVG_NS}}}style'):
+        for selector, body in re.findall(r'([^{}]+)\{([^}]*)\}', style.text or ''):
+            props = parse_declarations(body)
+            for name in selector.split(','):
+                name = name.strip()
+                if name.startswith('.'):
+                    rules.setdefault(name[1:], {}).update(props)
+    return rules
+
+def parse_declarations(text):
+    """Parse `prop:value;prop:value` into a dict"""
+    props = {}
+    for item in text.split(';'):
+        if ':' in item:
+            key, value = item.split(':', 1)
+            props[key.strip()] = value.strip()
+    return props
+
+def resolve_fill(elem, rules, inherited):
+    """Resolve the fill of an element the way a browser would for our exports"""
+    fill = inherited
+    for cls in elem.get('class', '').split():
+        fill = rules.get(cls, {}).get('fill', fill)
+    fill = parse_declarations(elem.get('style', '')).get('fill', fill)
+    return elem.get('fill', fill)
+
+@functools.lru_cache(maxsize=None)
+def load_display_list(svg_path):
+    """Parse an SVG file once into a cached display list"""
+    root = ET.parse(svg_path).getroot()
+    rules = parse_style_rules(root)
+
+    view_box = root.get('viewBox')
+    if view_box:
+        view_box = tuple(float(v) for v in view_box.replace(',', ' ').split())
+    else:
+        view_box = (0.0, 0.0, float(root.get('width')), float(root.get('height')))
+
+    defs = []
+    shapes = []
+
+    def walk(elem, fill, transform):
+        for child in elem:
+            tag = local_name(child.tag)
+            child_fill = resolve_fill(child, rules, fill)
+            child_transform = ' '.join(t for t in (transform, child.get('transform')) if t)
+            if tag in PAINT_SERVER_TAGS:
+                defs.append(ET.tostring(child, encoding='unicode').strip())
+            elif tag in SHAPE_TAGS:
+                geometry = tuple((a, child.get(a)) for a in GEOMETRY_ATTRS if child.get(a) is not None)
+                shapes.append(Shape(tag, geometry, child_fill, child_transform))
+            elif tag in ('g', 'defs'):
+                walk(child, child_fill, child_transform)
+
+    walk(root, '#000000', '')
+    return DisplayList(view_box, tuple(defs), tuple(shapes))
+
+def fit_size(view_box, size):
+    """Fit the viewBox into a size x size box, keeping the aspect ratio"""
+    width, height = view_box[2], view_box[3]
+    scale = size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def color_to_svg(color):
+    """Convert an RGBA tuple to SVG fill attributes"""
+    fill = '#{:02x}{:02x}{:02x}'.format(*color[:3])
+    if len(color) > 3 and color[3] != 255:
+        return f'fill="{fill}" fill-opacity="{color[3] / 255:.4g}"'
+    return f'fill="{fill}"'
+
+def display_list_to_svg(display_list, width, height, color=None):
+    """Build a minimal SVG document for the display list at the given size"""
+    view_box = ' '.join(f'{v:g}' for v in display_list.view_box)
+    parts = [f'<svg xmlns="{SVG_NS}" width="{width}" height="{height}" viewBox="{view_box}">']
+    if color is None and display_list.defs:
+        parts.append('<defs>' + ''.join(display_list.defs) + '</defs>')
+
+    for shape in display_list.shapes:
+        attrs = ' '.join(f'{name}="{value}"' for name, value in shape.geometry)
+        if color is None:
+            attrs += f' fill="{shape.fill}"'
+        else:
+            attrs += ' ' + color_to_svg(color)
+        if shape.transform:
+            attrs += f' transform="{shape.transform}"'
+        parts.append(f'<{shape.tag} {attrs}/>')
+
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+@functools.lru_cache(maxsize=None)
+def svg_backend():
+    """First installed SVG rasterizer as (name, version), or None"""
+    try:
+        import cairosvg
+        return 'cairosvg', cairosvg.__version__
+    except (ImportError, OSError):
+        pass
+    try:
+        import resvg_py
+        return 'resvg', getattr(resvg_py, '__version__', '')
+    except ImportError:
+        return None
+
+def rasterize_svg(svg_text, width, height):
+    """Rasterize SVG markup to PNG bytes with whichever local renderer is installed"""
+    backend = svg_backend()
+    if backend is None:
+        raise RuntimeError("No SVG renderer found. Please run: pip install cairosvg (or resvg-py)")
+
+    if backend[0] == 'cairosvg':
+        import cairosvg
+        return cairosvg.svg2png(bytestring=svg_text.encode('utf-8'),
+                                output_width=width, output_height=height)
+    import resvg_py
+    return bytes(resvg_py.svg_to_bytes(svg_string=svg_text, width=width, height=height))
+
+@functools.lru_cache(maxsize=None)
+def renderer_available():
+    """Check whether a local SVG renderer can be used"""
+    try:
+        rasterize_svg(f'<svg xmlns="{SVG_NS}" width="1" height="1"/>', 1, 1)
+        return True
+    except RuntimeError:
+        return False
+
+def render_display_list(display_list, size, color=None):
+    """
+    Render a display list into a size x size box. When color is given every
+    shape is filled with it directly instead of recoloring a bitmap afterwards.
+    """
+    width, height = fit_size(display_list.view_box, size)
+    svg_text = display_list_to_svg(display_list, width, height, color)
+    png_data = rasterize_svg(svg_text, width, height)
+    return Image.open(BytesIO(png_data)).convert('RGBA')
+
+def render_logo(svg_path, size, color=None):
+    """Render an SVG logo file at the given size"""
+    return render_display_list(load_display_list(svg_path), size, color)
+
+def main():
+    """Compare vector rendering with downscaling the exported PNG"""
+    svg_path = sys.argv[1] if len(sys.argv) > 1 else TOS_SVG
+    png_path = svg_path[:-4] + '.png'
+    sizes = [16, 32, 48, 64, 128, 256, 512]
+
+    if not renderer_available():
+        print("Error: no SVG renderer found. Please run:")
+        print("  pip install cairosvg   (or: pip install resvg-py)")
+        return
+
+    load_display_list(svg_path)
+    print(f"Vector source: {svg_path}")
+    for size in sizes:
+        start = time.perf_counter()
+        img = render_logo(svg_path, size)
+        vector_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        bitmap = Image.open(png_path).convert('RGBA')
+        bitmap.thumbnail((size, size), Image.Resampling.LANCZOS)
+        bitmap_ms = (time.perf_counter() - start) * 1000
+
+        print(f"  {size:>4}px  vector {vector_ms:7.2f} ms  png downscale {bitmap_ms:7.2f} ms  ({img.size[0]}x{img.size[1]})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from PIL import Image
+
+import build_cache
+import logo_layout
+
+def fresh_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv(build_cache.CACHE_ENV, str(tmp_path))
+    monkeypatch.setattr(logo_layout, '_layouts', {})
+    logo_layout.open_cache.cache_clear()
+
+def test_bitmaps_measured_in_sequence_keep_their_own_layout(monkeypatch, tmp_path):
+    fresh_cache(monkeypatch, tmp_path)
+    inset = Image.new('RGBA', (100, 100), (0, 0, 0, 0))
+    inset.paste((255, 0, 0, 255), (10, 0, 90, 100))
+    opaque = Image.new('RGBA', (100, 100), (255, 0, 0, 255))
+
+    assert logo_layout.image_layout(inset).bbox == (0.1, 0.0, 0.9, 1.0)
+    assert logo_layout.image_layout(opaque).bbox == (0.0, 0.0, 1.0, 1.0)
+
+    # A later run reads both from the persistent cache
+    fresh_cache(monkeypatch, tmp_path)
+    assert logo_layout.image_layout(opaque).bbox == (0.0, 0.0, 1.0, 1.0)
+    assert logo_layout.image_layout(inset).bbox == (0.1, 0.0, 0.9, 1.0)
+    logo_layout.open_cache.cache_clear()
@@ -0,0 +1,49 @@
+from io import BytesIO
+import os
+
+from PIL import Image
+import numpy as np
+import pytest
+
+import svg_render
+from optimize_svg import optimize_svg_text, round_numbers, round_path
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg">{}</svg>'
+
+def test_compact_path_numbers_stay_separate():
+    svg = optimize_svg_text(SVG.format('<path d="M10.001.5 L3 4"/>'))
+    assert 'd="M10 .5 L3 4"' in svg
+
+def test_rounded_neighbours_do_not_merge():
+    assert round_numbers('1.2.4', 0) == '1 0'
+    assert round_numbers('1.25.5', 1, True) == '1.2.5'
+    assert round_numbers('3-.5', 2, True) == '3-.5'
+
+def test_transform_keeps_matrix_precision():
+    svg = optimize_svg_text(SVG.format('<path transform="matrix(0.7071 0.7071 -0.7071 0.7071 10.123 0)" d="M0 0"/>'))
+    assert 'matrix(0.7071 0.7071 -0.7071 0.7071 10.123 0)' in svg
+
+def test_coordinates_use_default_precision():
+    svg = optimize_svg_text(SVG.format('<rect x="1.23456" width="0.5"/>'))
+    assert 'x="1.23"' in svg
+
+def test_compact_arc_flags_stay_single_characters():
+    assert round_path('a10 10 0 0110 10', 2) == 'a10 10 0 0110 10'
+    assert round_path('a1 1 0 00.5.5', 2) == 'a1 1 0 00.5.5'
+    assert round_path('A5 5 0.5 1 0 3.25,4z', 2) == 'A5 5 .5 1 0 3.25,4z'
+
+def test_gradient_stops_keep_unit_precision():
+    svg = optimize_svg_text(SVG.format('<stop offset="0.1515" stop-opacity="0.5212"/>'))
+    assert 'offset="0.1515"' in svg and 'stop-opacity="0.5212"' in svg
+
+def test_optimized_gold_logo_renders_like_the_original():
+    if not svg_render.renderer_available():
+        pytest.skip("no SVG renderer installed")
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logo_ai', 'tos1024.svg')) as f:
+        original = f.read()
+
+    def render(svg):
+        png = svg_render.rasterize_svg(svg, 841, 841)
+        return np.asarray(Image.open(BytesIO(png)).convert('RGBA')).astype(int)
+
+    assert np.abs(render(original) - render(optimize_svg_text(original))).max() <= 2
@@ -0,0 +1,19 @@
+import re
+
+import pytest
+
+import glyph_outlines
+import svg_banners
+
+WIDTH, HEIGHT, LOGO_SIZE, PADDING = 950, 370, (250, 250), 60
+
+def test_network_banner_text_fits_the_canvas():
+    font = glyph_outlines.banner_font()
+    if font is None:
+        pytest.skip("fontTools or a banner font is missing")
+
+    svg = svg_banners.render_network_banner(WIDTH, HEIGHT, LOGO_SIZE, PADDING, "TOS Network", 90,
+                                            'logo.svg', '#000000', '#FFFFFF', font=font)
+    x, scale = re.search(r'translate\(([\d.]+) [\d.]+\) scale\(([\d.e-]+) ', svg).groups()
+    advance = glyph_outlines.trace("TOS Network", font)[1]
+    assert float(x) + advance * float(scale) <= WIDTH - PADDING + 0.5
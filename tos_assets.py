@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+tos-assets: single entry point for the asset generators. Jobs are planned
+with the standard library only; PIL and the renderers are imported when a
+job actually runs.
+"""
+
+import argparse
+import fnmatch
+import importlib
+import os
+import time
+
+import asset_jobs
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def select(jobs, patterns):
+    """Jobs whose output path matches any of the --only globs"""
+    if not patterns:
+        return jobs
+    return [job for job in jobs if any(fnmatch.fnmatch(job.path, p) for p in patterns)]
+
+def by_module(jobs):
+    """Group jobs by renderer module, keeping plan order"""
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.module, []).append(job)
+    return groups
+
+def print_list(jobs):
+    for job in jobs:
+        print(f"{job.path}  ~{job.estimate_ms:.0f} ms")
+
+def print_plan(jobs):
+    """Planned job graph with estimated cost and peak memory per job and per renderer"""
+    total = 0
+    for module, group in by_module(jobs).items():
+        cost = sum(job.estimate_ms for job in group)
+        total += cost
+        print(f"{module}.py: {len(group)} jobs, ~{cost:.0f} ms")
+        for job in group:
+            size = f"{job.size[0]}x{job.size[1]}" if job.size else ''
+            peak = asset_jobs.peak_bytes(job) / 2**20
+            print(f"  {job.path:<58} {job.kind:<20} {size:>9} {job.estimate_ms:>7.0f} ms {peak:>5.0f} MB")
+    print(f"\nTotal: {len(jobs)} jobs, estimated {total / 1000:.1f} s")
+
+def run(jobs, workers, budget):
+    """
+    Render jobs, on a memory-aware process pool when workers > 1, then run
+    the serial post-processing modules on the written files
+    """
+    from asset_output import AssetOutput
+
+    start = time.perf_counter()
+    output = AssetOutput()
+    render = [job for job in jobs if job.module not in asset_jobs.SERIAL_MODULES]
+    serial = [job for job in jobs if job.module in asset_jobs.SERIAL_MODULES]
+
+    if workers > 1 and len(render) > 1:
+        import scheduler
+        scheduler.Scheduler(budget, workers).run(render, output)
+    else:
+        for module, group in by_module(render).items():
+            print(f"\n{module}.py: {len(group)} jobs")
+            importlib.import_module(module).render_jobs(output, group)
+
+    output.flush()
+    for module, group in by_module(serial).items():
+        print(f"\n{module}.py: {len(group)} jobs")
+        importlib.import_module(module).render_jobs(output, group)
+    output.close()
+
+    estimate = sum(job.estimate_ms for job in jobs)
+    print(f"\nRendered {len(jobs)} jobs in {time.perf_counter() - start:.2f} s (estimated {estimate / 1000:.2f} s)")
+
+def main():
+    parser = argparse.ArgumentParser(prog='tos-assets', description="Generate TOS logos, icons and banners")
+    parser.add_argument('command', choices=list(asset_jobs.COMMANDS), help="what to build")
+    parser.add_argument('--only', action='append', default=[], metavar='GLOB',
+                        help="only build outputs whose path matches (repeatable), e.g. 'icons/png/circle/*'")
+    parser.add_argument('--list', action='store_true', help="list the outputs that would be built")
+    parser.add_argument('--dry-run', action='store_true', help="print the job graph with estimated cost")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="parallel render processes (1: in-process)")
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help="memory for concurrently running jobs (default: $TOS_MEMORY_BUDGET or 75%% of the limit)")
+    args = parser.parse_args()
+
+    # Generators use repository-relative paths
+    os.chdir(REPO_ROOT)
+
+    jobs = select(asset_jobs.plan(args.command), args.only)
+    if not jobs:
+        parser.exit(1, f"No jobs match {' '.join(args.only)}\n")
+
+    if args.list:
+        print_list(jobs)
+    elif args.dry_run:
+        print_plan(jobs)
+    else:
+        run(jobs, args.jobs, args.memory_budget * 2**20 if args.memory_budget else None)
+
+if __name__ == "__main__":
+    main()